@@ -0,0 +1,34 @@
+# Generated by Django 5.1.4 on 2026-10-15 10:00
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def delete_duplicate_epcdata(apps, schema_editor):
+    """제약 추가 전, 같은 (date, data) 중복 row는 가장 먼저 저장된 1건만 남기고 정리."""
+    EPCdata = apps.get_model('inventory2', 'EPCdata')
+    keep_ids = (
+        EPCdata.objects
+        .filter(date__isnull=False)
+        .values('date', 'data')
+        .annotate(keep_id=Min('id'))
+        .values('keep_id')
+    )
+    EPCdata.objects.filter(date__isnull=False).exclude(id__in=keep_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory2', '0002_alter_inventory2_options_and_more'),
+    ]
+
+    # EPCdata.Meta.constraints에 같은 선언이 있어야 함 (없으면 makemigrations가 제약 삭제 마이그레이션 생성):
+    #   models.UniqueConstraint(fields=['date', 'data'], name='uniq_epcdata_date_data')
+    operations = [
+        migrations.RunPython(delete_duplicate_epcdata, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='epcdata',
+            constraint=models.UniqueConstraint(fields=('date', 'data'), name='uniq_epcdata_date_data'),
+        ),
+    ]
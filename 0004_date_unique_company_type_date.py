@@ -0,0 +1,64 @@
+# Generated by Django 5.1.4 on 2026-10-15 10:30
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_dates(apps, schema_editor):
+    """
+    제약 추가 전, 같은 (company, type, date) Date 중복을 가장 먼저 생성된 1건으로 병합.
+    - 하위 데이터(FK)는 남길 Date로 재연결 후 중복 Date 삭제(CASCADE로 데이터가 사라지지 않도록)
+    - EPCdata는 (date, data) 유니크라 이미 같은 EPC가 있으면 중복 row를 삭제
+    """
+    Date = apps.get_model('inventory2', 'Date')
+    EPCdata = apps.get_model('inventory2', 'EPCdata')
+    related_models = [
+        apps.get_model('inventory2', name)
+        for name in ('Inventory2', 'Specification', 'RFIDScan', 'InventoryDiscrepancy')
+    ]
+
+    duplicate_groups = (
+        Date.objects
+        .filter(date__isnull=False)
+        .values('company_id', 'type_id', 'date')
+        .annotate(keep_id=Min('id'), cnt=Count('id'))
+        .filter(cnt__gt=1)
+    )
+    for group in duplicate_groups:
+        keep_id = group['keep_id']
+        dup_ids = list(
+            Date.objects
+            .filter(company_id=group['company_id'], type_id=group['type_id'], date=group['date'])
+            .exclude(id=keep_id)
+            .values_list('id', flat=True)
+        )
+        for model in related_models:
+            model.objects.filter(date_id__in=dup_ids).update(date_id=keep_id)
+
+        kept_epcs = EPCdata.objects.filter(date_id=keep_id).values('data')
+        EPCdata.objects.filter(date_id__in=dup_ids, data__in=kept_epcs).delete()
+        first_epc_ids = (
+            EPCdata.objects.filter(date_id__in=dup_ids)
+            .values('data').annotate(first_id=Min('id')).values('first_id')
+        )
+        EPCdata.objects.filter(date_id__in=dup_ids).exclude(id__in=first_epc_ids).delete()
+        EPCdata.objects.filter(date_id__in=dup_ids).update(date_id=keep_id)
+
+        Date.objects.filter(id__in=dup_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory2', '0003_epcdata_unique_date_data'),
+    ]
+
+    # Date.Meta.constraints에 같은 선언이 있어야 함 (없으면 makemigrations가 제약 삭제 마이그레이션 생성):
+    #   models.UniqueConstraint(fields=['company', 'type', 'date'], name='uniq_date_company_type_date')
+    operations = [
+        migrations.RunPython(merge_duplicate_dates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='date',
+            constraint=models.UniqueConstraint(fields=('company', 'type', 'date'), name='uniq_date_company_type_date'),
+        ),
+    ]
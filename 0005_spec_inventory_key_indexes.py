@@ -0,0 +1,22 @@
+# Generated by Django 5.1.4 on 2026-10-15 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory2', '0004_date_unique_company_type_date'),
+    ]
+
+    # Specification/Inventory2.Meta.indexes에 같은 인덱스 선언이 있어야 함 (0006/0007에서 최종 형태로 교체됨)
+    operations = [
+        migrations.AddIndex(
+            model_name='specification',
+            index=models.Index(fields=['pie_healthcare_num', 'expiry_date', 'medication_lot_number'], name='spec_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventory2',
+            index=models.Index(fields=['pie_healthcare_num', 'expiry_date', 'medication_lot_number'], name='inv_key_idx'),
+        ),
+    ]
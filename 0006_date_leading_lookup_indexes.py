@@ -0,0 +1,30 @@
+# Generated by Django 5.1.4 on 2026-10-15 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory2', '0005_spec_inventory_key_indexes'),
+    ]
+
+    # 모델 Meta.indexes도 함께 교체해야 함:
+    #   Specification: models.Index(fields=['date', 'pie_healthcare_num', 'expiry_date', 'medication_lot_number'], name='spec_lookup_idx')
+    #   Inventory2:    models.Index(fields=['date', 'pie_healthcare_num', 'expiry_date', 'medication_lot_number'], name='inv_lookup_idx')
+    operations = [
+        # 스펙은 항상 date 조건과 함께 조회됨 → date 선두 인덱스로 교체 (date 단독 조회도 선두 prefix로 처리)
+        migrations.RemoveIndex(
+            model_name='specification',
+            name='spec_key_idx',
+        ),
+        migrations.AddIndex(
+            model_name='specification',
+            index=models.Index(fields=['date', 'pie_healthcare_num', 'expiry_date', 'medication_lot_number'], name='spec_lookup_idx'),
+        ),
+        # 재고는 date 없는 키 조회(출고 차감/불일치 서브쿼리)가 있으므로 inv_key_idx 유지 + date 선두 인덱스 추가
+        migrations.AddIndex(
+            model_name='inventory2',
+            index=models.Index(fields=['date', 'pie_healthcare_num', 'expiry_date', 'medication_lot_number'], name='inv_lookup_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.4 on 2026-10-15 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory2', '0006_date_leading_lookup_indexes'),
+    ]
+
+    # Inventory2.Meta.indexes에서 inv_key_idx를 아래 선언으로 교체해야 함:
+    #   models.Index(fields=['pie_healthcare_num', 'expiry_date', 'medication_lot_number', '-id'],
+    #                include=['stock_quantity'], name='inv_key_cover_idx')
+    operations = [
+        # 날짜 없는 재고 키 조회(불일치 서브쿼리: 키당 최신 id의 stock_quantity, 출고 차감)를 인덱스만으로 처리
+        # - id 내림차순까지 키에 포함 → ORDER BY id DESC LIMIT 1이 정렬 없이 첫 항목
+        # - stock_quantity는 INCLUDE(PostgreSQL 전용, 다른 DB에서는 무시) → 테이블 접근 없이 index-only scan
+        migrations.RemoveIndex(
+            model_name='inventory2',
+            name='inv_key_idx',
+        ),
+        migrations.AddIndex(
+            model_name='inventory2',
+            index=models.Index(
+                fields=['pie_healthcare_num', 'expiry_date', 'medication_lot_number', '-id'],
+                include=['stock_quantity'],
+                name='inv_key_cover_idx',
+            ),
+        ),
+    ]
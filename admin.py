@@ -43,6 +43,7 @@ class TypeAdmin(admin.ModelAdmin):
 @admin.register(Date)
 class DateAdmin(admin.ModelAdmin):
     list_display = ('company', 'type', 'date', 'created_at')
+    list_select_related = ('company', 'type')
     list_filter = ('company', 'type')
     search_fields = ('company__company_name', 'type__name', 'date')
 
@@ -60,6 +61,8 @@ class DefaultInventoryAdmin(admin.ModelAdmin):
 @admin.register(Inventory2)
 class Inventory2Admin(admin.ModelAdmin):
     list_display = ('date', 'pie_healthcare_num', 'expiry_date', 'medication_lot_number', 'stock_quantity')
+    list_select_related = ('date', 'date__company', 'date__type')
+    raw_id_fields = ('date',)
     list_filter = ('date',)
     search_fields = ('pie_healthcare_num', 'medication_lot_number')
 
@@ -68,6 +71,8 @@ class Inventory2Admin(admin.ModelAdmin):
 @admin.register(RFIDScan)
 class RFIDScanAdmin(admin.ModelAdmin):
     list_display = ( 'date', 'pie_healthcare_num', 'expiry_date', 'scanned_quantity',)
+    list_select_related = ('date', 'date__company', 'date__type')
+    raw_id_fields = ('date',)
     list_filter = ('date',)
     search_fields = ('pie_healthcare_num',)
 
@@ -76,6 +81,8 @@ class RFIDScanAdmin(admin.ModelAdmin):
 @admin.register(EPCdata)
 class EPCdataAdmin(admin.ModelAdmin):
     list_display = ('data', 'date')
+    list_select_related = ('date', 'date__company', 'date__type')
+    raw_id_fields = ('date',)
     list_filter = ('date',)
     search_fields = ('data',)
 
@@ -84,6 +91,8 @@ class EPCdataAdmin(admin.ModelAdmin):
 @admin.register(Specification)
 class SpecificationAdmin(admin.ModelAdmin):
     list_display = ('date', 'medication_name', 'pie_healthcare_num', 'expiry_date')
+    list_select_related = ('date', 'date__company', 'date__type')
+    raw_id_fields = ('date',)
     list_filter = ('date',)
     search_fields = ('pie_healthcare_num', 'medication_lot_number')
 
@@ -92,6 +101,8 @@ class SpecificationAdmin(admin.ModelAdmin):
 @admin.register(InventoryDiscrepancy)
 class InventoryDiscrepancyAdmin(admin.ModelAdmin):
     list_display = ('date', 'medication_name', 'pie_healthcare_num', 'expiry_date', 'reason')
+    list_select_related = ('date', 'date__company', 'date__type')
+    raw_id_fields = ('date',)
     list_filter = ('created_at',)
     search_fields = ('reason', 'pie_healthcare_num', 'created_at')
 
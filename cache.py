@@ -0,0 +1,92 @@
+"""
+바이트 상한 기반 로컬 메모리 캐시.
+
+LocMemCache는 MAX_ENTRIES(항목 수)로만 크기를 제한하므로, 값 크기가 제각각인
+해시 맵/스펙 캐시에서는 메모리가 과도하게 커지거나 아직 자주 쓰이는 항목이 밀려난다.
+여기서는 저장된 pickle 바이트 합계를 추적하여 MAX_BYTES를 넘으면 LRU 순으로 제거한다.
+(LocMemCache의 OrderedDict는 조회/저장 시 항목을 앞으로 옮기므로 맨 뒤가 가장 오래 안 쓰인 항목)
+"""
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache
+
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+# 같은 LOCATION을 쓰는 인스턴스(스레드별 생성)끼리 바이트 사용량을 공유
+_usages = {}
+
+
+class _ByteUsage:
+    __slots__ = ('sizes', 'total')
+
+    def __init__(self):
+        self.sizes = {}
+        self.total = 0
+
+
+class ByteBoundedLocMemCache(LocMemCache):
+    """OPTIONS['MAX_BYTES'] 바이트 상한을 넘으면 LRU 항목부터 제거하는 LocMemCache."""
+
+    def __init__(self, name, params):
+        super().__init__(name, params)
+        options = params.get('OPTIONS', {})
+        self._max_bytes = int(options.get('MAX_BYTES', DEFAULT_MAX_BYTES))
+        self._usage = _usages.setdefault(name, _ByteUsage())
+
+    # ========================================
+    # 사용량 추적
+    # ========================================
+
+    def _track(self, key, size):
+        self._usage.total += size - self._usage.sizes.get(key, 0)
+        self._usage.sizes[key] = size
+
+    def _forget(self, key):
+        self._usage.total -= self._usage.sizes.pop(key, 0)
+
+    def _evict_lru(self):
+        key, _ = self._cache.popitem()
+        self._expire_info.pop(key, None)
+        self._forget(key)
+
+    # ========================================
+    # LocMemCache 오버라이드 (모두 self._lock 보유 상태에서 호출됨)
+    # ========================================
+
+    def _set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        super()._set(key, value, timeout)
+        self._track(key, len(value))
+        # 방금 저장한 항목(맨 앞)은 남기고 상한 아래로 내려갈 때까지 제거
+        while self._usage.total > self._max_bytes and len(self._cache) > 1:
+            self._evict_lru()
+
+    def _cull(self):
+        if self._cull_frequency == 0:
+            self._clear_all()
+            return
+        for _ in range(len(self._cache) // self._cull_frequency):
+            self._evict_lru()
+
+    def _delete(self, key):
+        deleted = super()._delete(key)
+        if deleted:
+            self._forget(key)
+        return deleted
+
+    def _clear_all(self):
+        self._cache.clear()
+        self._expire_info.clear()
+        self._usage.sizes.clear()
+        self._usage.total = 0
+
+    def clear(self):
+        with self._lock:
+            self._clear_all()
+
+    def incr(self, key, delta=1, version=None):
+        new_value = super().incr(key, delta, version)
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            if key in self._cache:
+                self._track(key, len(self._cache[key]))
+        return new_value
@@ -0,0 +1,12 @@
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    대용량 테이블용 커서 페이지네이션 (뷰셋에서 pagination_class로 지정: RFIDScan, Specification 목록).
+    전역 기본(PageNumberPagination)은 count/?page=를 쓰는 다른 목록을 위해 유지.
+    - PageNumberPagination과 달리 매 요청 COUNT(*)를 하지 않음(Specification/RFIDScan처럼 계속 커지는 테이블에서 풀스캔 방지)
+    - PK 역순 정렬(인덱스 seek) → 테이블 크기와 무관하게 일정한 목록 지연시간
+    - page_size는 REST_FRAMEWORK['PAGE_SIZE'] 사용
+    """
+    ordering = '-id'
@@ -3,8 +3,11 @@ from django.db import models
 import re
 
 
+PIE_FORMAT_RE = re.compile(r'PIE\d{3}[A-Z0-9]{5}\d{6}\d{2}')
+
+
 def validate_pie_format(value):
-    if not re.match(r'^PIE\d{3}[A-Z0-9]{5}\d{6}\d{2}$', value):
+    if not PIE_FORMAT_RE.fullmatch(value):
         raise ValidationError("PIE 코드 포맷이 올바르지 않습니다.")
 
 
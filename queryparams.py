@@ -8,11 +8,13 @@ class QueryParamFilterMixin:
     """
     def get_queryset(self):
         queryset = super().get_queryset()  #  올바르게 부모 호출
+        # 직렬화 시 date → company/type 접근으로 row마다 추가 쿼리(N+1)가 나지 않도록 JOIN으로 한 번에 로딩
+        queryset = queryset.select_related('date', 'date__company', 'date__type')
 
         company_name = self.request.query_params.get("company")
         type_name = self.request.query_params.get("type")
         date = self.request.query_params.get("date")
-        logger.info(f"company_id: {company_name}, type_name: {type_name}, date: {date}")
+        logger.info("company_id: %s, type_name: %s, date: %s", company_name, type_name, date)
         if company_name:
             queryset = queryset.filter(date__company__id=company_name)
         if type_name:
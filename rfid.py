@@ -24,28 +24,32 @@ EPC 포맷(가정)
 
 성능 주의
 - 대량 처리 시 bulk_create/bulk_update, batch_size 적용
-- 캐시: hash 매핑, spec 매핑 등 메모리 캐시 사용. 무효화 타이밍 유의
+- 캐시: hash 매핑 캐시 사용(저장/삭제 시그널로 무효화). 스펙 맵은 청크마다 DB에서 조회
 """
 
-from django.db import transaction
+from django.db import connection, transaction
+from django.db.models.functions import Abs
+from django.utils import timezone
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from datetime import datetime
-from collections import defaultdict
+from collections import Counter, defaultdict
+from functools import lru_cache
 
 from inventory2.backend.mixins.queryparams import QueryParamFilterMixin
 from inventory2.backend.models.base import Company, Type, Date
-from inventory2.backend.models.manufacturinghash import ManufacturingHash
 from inventory2.backend.models.rfidscan import RFIDScan, EPCdata
 from inventory2.backend.models.inventory import Inventory2
 from inventory2.backend.models.specification import Specification
 from inventory2.backend.models.discrepancy import InventoryDiscrepancy
 from inventory2.backend.serializers.rfidscan import RFIDScanSerializer
 from inventory2.backend.utils.utils import create_specifications_from_rfid_scan, execute_discrepancy_check, \
-    update_inventory_from_specifications, carry_over_inventory
+    update_inventory_from_specifications, carry_over_inventory, get_type, \
+    get_or_create_date, parse_yyyymmdd, _get_cached_hash_map, BULK_BATCH_SIZE
 from core.logger import logger
+from core.pagination import IdCursorPagination
 from core.monitoring import monitor_performance, monitor_database_queries, log_business_operation
 
 # -----------------------------
@@ -59,6 +63,40 @@ PIE_NUM_LENGTH = 5
 EXPIRY_DATE_LENGTH = 6
 HASH_LENGTH = 9
 
+# EPC 필드 슬라이스 경계(EPC 전체 문자열 기준, 모듈 로드 시 1회 계산)
+_PIE_END = EPC_PREFIX_LENGTH + PIE_NUM_LENGTH
+_EXPIRY_END = _PIE_END + EXPIRY_DATE_LENGTH
+_HASH_END = _EXPIRY_END + HASH_LENGTH
+
+
+@lru_cache(maxsize=4096)
+def _parse_expiry(expiry_str):
+    """YYMMDD → date (범위 밖/형식 오류는 None). 스캔 묶음은 소수의 유효기간을 공유하므로 값 단위로 메모이즈."""
+    try:
+        expiry_date = datetime.strptime(expiry_str, "%y%m%d").date()
+    except ValueError:
+        return None
+    if not (MIN_EXPIRY_DATE <= expiry_date <= MAX_EXPIRY_DATE):
+        return None
+    return expiry_date
+
+
+def parse_epc(epc):
+    """
+    EPC 문자열을 고정 위치 슬라이스로 분리해 (pie_num, expiry_date, hashed_lot)을 반환. 실패 시 None.
+    - 정규식 없이 길이 확인 + 인덱스 슬라이스(prefix는 값 검사 없이 건너뜀, 뒤따르는 serial은 무시)
+    - expiry는 ASCII 숫자 6자리만 허용 후 _parse_expiry로 변환
+    """
+    if not isinstance(epc, str) or len(epc) < _HASH_END:
+        return None
+    expiry_str = epc[_PIE_END:_EXPIRY_END]
+    if not (expiry_str.isascii() and expiry_str.isdigit()):
+        return None
+    expiry_date = _parse_expiry(expiry_str)
+    if expiry_date is None:
+        return None
+    return (epc[EPC_PREFIX_LENGTH:_PIE_END], expiry_date, epc[_EXPIRY_END:_HASH_END])
+
 
 class RFIDScanViewSet(QueryParamFilterMixin, viewsets.GenericViewSet):
     """
@@ -78,56 +116,99 @@ class RFIDScanViewSet(QueryParamFilterMixin, viewsets.GenericViewSet):
     model = RFIDScan
     queryset = RFIDScan.objects.all()
     serializer_class = RFIDScanSerializer
+    pagination_class = IdCursorPagination  # COUNT(*) 없는 -id 커서(스캔 테이블은 계속 커짐)
 
-    @monitor_performance("epc_parsing")
-    def _parse_epc_data(self, epc):
-        """EPC(문자열)를 파싱하여 (pie_num, expiry_date, hashed_lot)을 반환."""
-        try:
-            epc_data = epc[EPC_PREFIX_LENGTH:]
-            pie_num = epc_data[:PIE_NUM_LENGTH]
-            expiry_date_str = epc_data[PIE_NUM_LENGTH:PIE_NUM_LENGTH + EXPIRY_DATE_LENGTH]
-            hashed_lot = epc_data[PIE_NUM_LENGTH + EXPIRY_DATE_LENGTH:PIE_NUM_LENGTH + EXPIRY_DATE_LENGTH + HASH_LENGTH]
-            expiry_date = datetime.strptime(expiry_date_str, "%y%m%d").date()
-
-            if not (MIN_EXPIRY_DATE <= expiry_date <= MAX_EXPIRY_DATE):
-                logger.warning(f"유효하지 않은 expiry_date → {epc}")
-                return None
+    @monitor_performance("epc_batch_parsing")
+    def _parse_epc_batch(self, epcs):
+        """
+        EPC 문자열 리스트를 한 번에 파싱하면서 (pie_num, expiry_date, hashed_lot)별 건수로 바로 집계(Counter).
+        - 필드 분리는 parse_epc(고정 위치 슬라이스) 한 번으로 처리
+        - EPC별 튜플 리스트를 따로 만들지 않음 → 이후 해시 조회/집계는 고유 키 단위로만 수행
+        - 포맷 불일치/유효기간 범위 밖 EPC는 건너뛰고 건수만 요약 로그
+        """
+        parsed = Counter(map(parse_epc, epcs))
+        invalid_count = parsed.pop(None, 0)
 
-            return (pie_num, expiry_date, hashed_lot)
-        except Exception as e:
-            logger.warning(f"EPC 파싱 실패: {epc} | 이유: {e}")
-            return None
+        if invalid_count:
+            logger.warning("EPC 파싱 실패/유효하지 않은 expiry_date: %s건 제외", invalid_count)
+        return parsed
 
     def _get_existing_epcs(self, date_obj, datalist):
         """현재 date에 이미 저장된 EPC 문자열 집합을 반환하여 중복 전송을 필터링."""
         return set(EPCdata.objects.filter(date=date_obj, data__in=datalist).values_list("data", flat=True))
 
     def _create_new_epc_records(self, new_epcs, date_obj):
-        """EPCdata에 신규 EPC를 일괄 저장."""
-        new_epcs_objs = EPCdata.objects.bulk_create([
-            EPCdata(date=date_obj, data=epc) for epc in new_epcs
-        ])
-        logger.info(f"{len(new_epcs_objs)} new EPCs created.")
+        """
+        EPCdata에 신규 EPC를 일괄 저장.
+        - batch_size로 INSERT 1회당 row 수 제한
+        - ignore_conflicts: 동시 요청으로 같은 EPC가 먼저 들어간 경우에도 요청 전체가 실패하지 않도록 함
+          (중복 판정 자체는 _get_existing_epcs 결과 기준; ignore_conflicts는 신규 row 구분 정보를 돌려주지 않음)
+        """
+        new_epcs_objs = EPCdata.objects.bulk_create(
+            [EPCdata(date=date_obj, data=epc) for epc in new_epcs],
+            batch_size=BULK_BATCH_SIZE,
+            ignore_conflicts=True
+        )
+        logger.info("%s new EPCs created.", len(new_epcs_objs))
         return new_epcs_objs
 
-    def _get_hash_mapping(self, hashed_codes):
-        """hashed lot 목록에 대해 DB에서 original lot 매핑을 조회."""
-        return {
-            h.hashed_code: h.original_code
-            for h in ManufacturingHash.objects.filter(hashed_code__in=hashed_codes)
-        }
+    def _insert_new_epcs_returning(self, date_obj, datalist):
+        """
+        (PostgreSQL 전용) 기존 EPC 조회 + 신규 INSERT를 한 문장으로 처리하고, 실제로 저장된 EPC 집합을 반환.
+        INSERT ... SELECT FROM unnest(...) ON CONFLICT DO NOTHING RETURNING data
+        → uniq_epcdata_date_data(date, data) 제약이 중복 판정 기준.
+        """
+        qn = connection.ops.quote_name
+        opts = EPCdata._meta
+        date_col = qn(opts.get_field('date').column)
+        data_col = qn(opts.get_field('data').column)
+        created_col = qn(opts.get_field('created_at').column)
+        sql = (
+            f"INSERT INTO {qn(opts.db_table)} ({date_col}, {data_col}, {created_col}) "
+            f"SELECT %s, t.data, %s FROM unnest(%s::text[]) AS t(data) "
+            f"ON CONFLICT ({date_col}, {data_col}) DO NOTHING "
+            f"RETURNING {data_col}"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [date_obj.pk, timezone.now(), list(datalist)])
+            return {row[0] for row in cursor.fetchall()}
+
+    def _store_new_epcs(self, datalist, date_obj):
+        """
+        datalist 중 현재 date에 처음 들어온 EPC만 EPCdata에 저장하고, 해당 EPC 목록(입력 순서 유지)을 반환.
+        - 같은 요청 안의 중복 EPC(리더기 재판독)는 먼저 1건으로 정리 → 한 태그가 여러 번 집계/저장되지 않음
+        - PostgreSQL: _insert_new_epcs_returning 한 번(왕복 1회)
+        - 그 외 DB(테스트용 SQLite 등): 기존 EPC 조회 → 집합 차집합 → bulk_create (왕복 2회)
+        """
+        unique_epcs = list(dict.fromkeys(datalist))  # 순서 유지 dedupe
 
-    def _aggregate_scan_counts(self, parsed_info, hash_map):
-        """파싱된 EPC → (pie_num, expiry, original_lot)별 스캔 수량 집계."""
-        scanned_count = defaultdict(int)
-        null_lot_count = 0
+        if connection.vendor == 'postgresql':
+            inserted = self._insert_new_epcs_returning(date_obj, unique_epcs)
+            logger.info("%s new EPCs created.", len(inserted))
+            return [epc for epc in unique_epcs if epc in inserted]
 
-        for pie_healthcare_num, expiry_date, hashed_lot in parsed_info:
-            original_lot = hash_map.get(hashed_lot)
-            if original_lot is None:
-                null_lot_count += 1
-                logger.warning(f"해시값 미존재 → {hashed_lot}, None 처리")
-            scanned_count[(pie_healthcare_num, expiry_date, original_lot)] += 1
+        new_epc_set = set(unique_epcs).difference(self._get_existing_epcs(date_obj, unique_epcs))
+        new_epcs = [epc for epc in unique_epcs if epc in new_epc_set]
+        self._create_new_epc_records(new_epcs, date_obj)
+        return new_epcs
+
+    def _get_hash_mapping(self, hashed_codes):
+        """hashed lot 목록에 대해 original lot 매핑을 조회(캐시 우선, 미스 시 DB 전체 맵 1회 로딩)."""
+        return _get_cached_hash_map(hashed_codes)
+
+    def _aggregate_scan_counts(self, parsed_counts, hash_map):
+        """
+        (pie_num, expiry, hashed_lot)별 건수 → (pie_num, expiry, original_lot)별 스캔 수량 집계.
+        - 고유 키 단위로만 해시 → LOT 변환(EPC 건수가 아니라 키 개수만큼 순회)
+        - 해시 미존재(None lot) 건수는 집계 결과에서 합산, 로그는 요약 1줄
+        """
+        get_lot = hash_map.get
+        scanned_count = Counter()
+        for (pie_healthcare_num, expiry_date, hashed_lot), count in parsed_counts.items():
+            scanned_count[(pie_healthcare_num, expiry_date, get_lot(hashed_lot))] += count
+        null_lot_count = sum(count for (_, _, lot), count in scanned_count.items() if lot is None)
+        if null_lot_count:
+            logger.warning("해시값 미존재 → %s건 None 처리", null_lot_count)
 
         return scanned_count, null_lot_count
 
@@ -148,21 +229,19 @@ class RFIDScanViewSet(QueryParamFilterMixin, viewsets.GenericViewSet):
     @monitor_database_queries
     def _process_epc_data(self, datalist, date_obj):
         """원시 EPC 문자열 리스트(datalist)를 처리하여 RFIDScan 인스턴스 리스트를 생성."""
-        existing_epcs = self._get_existing_epcs(date_obj, datalist)
-        new_epcs = [epc for epc in datalist if epc not in existing_epcs]
-
-        self._create_new_epc_records(new_epcs, date_obj)
+        new_epcs = self._store_new_epcs(datalist, date_obj)
 
-        parsed_info = []
-        for epc in new_epcs:
-            parsed = self._parse_epc_data(epc)
-            if parsed:
-                parsed_info.append(parsed)
+        parsed_counts = self._parse_epc_batch(new_epcs)
+        parsed_total = sum(parsed_counts.values())
 
-        hashed_codes = [x[2] for x in parsed_info]
-        hash_map = self._get_hash_mapping(hashed_codes)
-        scanned_count, null_lot_count = self._aggregate_scan_counts(parsed_info, hash_map)
+        hash_map = self._get_hash_mapping({hashed_lot for _, _, hashed_lot in parsed_counts})
+        scanned_count, null_lot_count = self._aggregate_scan_counts(parsed_counts, hash_map)
 
+        # EPC 단위 경고 대신 요청당 요약 1줄
+        logger.info(
+            "EPC 처리 요약: input=%d new=%d parsed=%d parse_fail=%d null_lot=%d",
+            len(datalist), len(new_epcs), parsed_total, len(new_epcs) - parsed_total, null_lot_count
+        )
         # NOTE: 운영 가시성 향상을 위해 null_lot_count/new_epcs 수를 Response에 포함 권장
         return self._create_rfid_scan_instances(scanned_count, date_obj)
 
@@ -171,6 +250,7 @@ class RFIDScanViewSet(QueryParamFilterMixin, viewsets.GenericViewSet):
         return (
             Date.objects
             .filter(company=date_obj.company, type=date_obj.type, date__lt=date_obj.date)
+            .only('id', 'date', 'company', 'type')  # 이월에는 pk/날짜만 필요
             .order_by('-date')
             .first()
         )
@@ -209,7 +289,7 @@ class RFIDScanViewSet(QueryParamFilterMixin, viewsets.GenericViewSet):
     def _get_type_and_company(self, type_name, company_name, company_code):
         """유효한 Type/Company 객체를 조회하고, 회사가 해당 타입을 사용할 수 있는지 권한 확인."""
         try:
-            type_obj = Type.objects.get(name=type_name)
+            type_obj = get_type(type_name)
         except Type.DoesNotExist:
             return None, None, Response({"status": "error", "message": f"타입 '{type_name}'이 존재하지 않습니다."}, status=400)
 
@@ -232,7 +312,7 @@ class RFIDScanViewSet(QueryParamFilterMixin, viewsets.GenericViewSet):
         try:
             return Company.objects.get(company_name=other_company_name)
         except Company.DoesNotExist:
-            logger.warning(f"다른 회사 '{other_company_name}'이 존재하지 않습니다.")
+            logger.warning("다른 회사 '%s'이 존재하지 않습니다.", other_company_name)
             return None
 
     def _process_datalist(self, datalist):
@@ -249,20 +329,14 @@ class RFIDScanViewSet(QueryParamFilterMixin, viewsets.GenericViewSet):
         같은 날짜/회사/타입의 Specification 수량을 전부 양수로 보정.
         유틸이 출고를 음수로 저장하더라도 여기서 일괄 양수화.
         """
-        t = Type.objects.get(name=type_name)
-        qs = Specification.objects.filter(
+        t = get_type(type_name)
+        # 음수 row만 단일 UPDATE ... SET stock_quantity = ABS(stock_quantity) 로 처리(앱으로 row 전송 없음)
+        Specification.objects.filter(
             date__date=date_obj.date,
             date__company=date_obj.company,
-            date__type=t
-        ).only('id', 'stock_quantity')
-        to_update = []
-        for s in qs:
-            q = int(s.stock_quantity or 0)
-            if q < 0:
-                s.stock_quantity = abs(q)
-                to_update.append(s)
-        if to_update:
-            Specification.objects.bulk_update(to_update, ['stock_quantity'], batch_size=200)
+            date__type=t,
+            stock_quantity__lt=0
+        ).update(stock_quantity=Abs('stock_quantity'))
 
     # -----------------------------
     # 분기 처리
@@ -274,21 +348,38 @@ class RFIDScanViewSet(QueryParamFilterMixin, viewsets.GenericViewSet):
         1) 스펙 생성(create_specifications_from_rfid_scan, operation_type="재고")
         2) 스펙 기반 Inventory 덮어쓰기(update_inventory_from_specifications)
         3) 불일치 계산/저장(execute_discrepancy_check)
+
+        세 단계를 트랜잭션 1개로 묶음(COMMIT 1회).
+        각 유틸은 예외를 잡아 {"success": False}로 돌려주므로, 단계 결과가 실패면 set_rollback으로
+        앞 단계 쓰기까지 모두 되돌리고 즉시 반환(이후 단계는 실행하지 않음 → 반쯤 반영된 상태 방지).
         """
-        spec_result = create_specifications_from_rfid_scan(rfid_scan_instances, "재고")
-        if spec_result.get("success", True):
-            specs = Specification.objects.filter(date=date_obj)
-            inventory_result = update_inventory_from_specifications(specs, "재고")
-        else:
-            inventory_result = {"success": False, "message": "스펙 생성 실패"}
-
-        discrepancy_result = execute_discrepancy_check(Specification.objects.filter(date=date_obj))
-        return {
-            "status": "재고조사 완료",
-            "spec": spec_result,
-            "inventory": inventory_result,
-            "discrepancy": discrepancy_result
-        }
+        result = {"status": "재고조사 완료"}
+        with transaction.atomic():
+            result["spec"] = create_specifications_from_rfid_scan(rfid_scan_instances, "재고")
+            if not result["spec"].get("success", True):
+                transaction.set_rollback(True)
+                result["status"] = "재고조사 실패(스펙 생성)"
+                return result
+
+            # 같은 날짜 스펙을 한 번만 읽어 재고 반영/불일치 계산에 함께 사용(재조회 제거).
+            # NOTE: 불일치 계산은 날짜 단위로 지우고 다시 만들기 때문에, 이번 스캔분이 아닌 날짜 전체 스펙이 필요.
+            specs = list(Specification.objects.filter(date=date_obj).select_related('date'))
+            if not specs:
+                # 반영할 스펙이 없으면(모든 스캔이 기본 재고 미등록 등으로 제외) 재고/불일치 단계 생략
+                result["inventory"] = result["discrepancy"] = {"success": True, "message": "반영할 스펙이 없습니다."}
+                return result
+
+            result["inventory"] = update_inventory_from_specifications(specs, "재고")
+            if not result["inventory"].get("success", True):
+                transaction.set_rollback(True)
+                result["status"] = "재고조사 실패(재고 반영)"
+                return result
+
+            result["discrepancy"] = execute_discrepancy_check(specs)
+            if not result["discrepancy"].get("success", True):
+                transaction.set_rollback(True)
+                result["status"] = "재고조사 실패(불일치 계산)"
+        return result
 
     def _handle_outgoing_type(self, rfid_scan_instances, date_obj):
         """
@@ -330,12 +421,8 @@ class RFIDScanViewSet(QueryParamFilterMixin, viewsets.GenericViewSet):
         matched = compute_matched_specs_for_transfer(outgoing_specs, inspected_specs)
 
         # B 쪽 동일 날짜 + type='재고' Date 준비
-        stock_type = Type.objects.get(name='재고')
-        recv_date_obj, _ = Date.objects.get_or_create(
-            company=other_company_obj,
-            type=stock_type,
-            date=date_obj.date
-        )
+        stock_type = get_type('재고')
+        recv_date_obj = get_or_create_date(other_company_obj, stock_type, date_obj.date)
 
         transfer_result = apply_transfer_by_match_v2(
             matched_specs=matched,
@@ -346,8 +433,8 @@ class RFIDScanViewSet(QueryParamFilterMixin, viewsets.GenericViewSet):
         )
 
         logger.info(
-            f"[검수 이송 요약] matched_keys={len(matched)}, "
-            f"matched_qty={sum(int(q) for q in matched.values())}"
+            "[검수 이송 요약] matched_keys=%s, matched_qty=%s",
+            len(matched), sum(int(q) for q in matched.values())
         )
 
         return {
@@ -356,7 +443,6 @@ class RFIDScanViewSet(QueryParamFilterMixin, viewsets.GenericViewSet):
             "transfer_result": transfer_result
         }
 
-    @transaction.atomic
     @action(detail=False, methods=['post'], url_path='bulk_create')
     @monitor_performance("rfid_bulk_create")
     @monitor_database_queries
@@ -376,10 +462,10 @@ class RFIDScanViewSet(QueryParamFilterMixin, viewsets.GenericViewSet):
             if error_response:
                 return error_response
 
-            date_ = datetime.strptime(validated_data['date_str'], "%Y%m%d")
-            logger.info(f"bulk_create : {validated_data['date_str']} | date_ : {date_}")
-            date_obj, _ = Date.objects.get_or_create(date=date_, company=company_obj, type=type_obj)
-            logger.info(f"date_obj={date_obj}")
+            date_ = parse_yyyymmdd(validated_data['date_str'])
+            logger.info("bulk_create : %s | date_ : %s", validated_data['date_str'], date_)
+            date_obj = get_or_create_date(company_obj, type_obj, date_)
+            logger.info("date_obj=%s", date_obj)
 
             # 이월은 '검수'에서만
             if validated_data['type_name'] == "검수":
@@ -388,8 +474,13 @@ class RFIDScanViewSet(QueryParamFilterMixin, viewsets.GenericViewSet):
             other_company_obj = self._get_other_company(validated_data['other_company_name'])
             datalist = self._process_datalist(validated_data['datalist'])
 
-            rfid_scan_instances = self._process_epc_data(datalist, date_obj)
-            RFIDScan.objects.bulk_create(rfid_scan_instances)
+            # 트랜잭션은 쓰기 구간 단위로 짧게 유지(요청 전체를 묶으면 파싱/캐시 조회 동안에도 락 유지).
+            # - 수집: EPCdata + RFIDScan 저장을 한 블록으로(원본 EPC만 남고 스캔이 빠지는 상태 방지)
+            # - 재고: 스펙→재고→불일치 3단계를 한 트랜잭션으로(_handle_inventory_type)
+            # - 그 외 스펙 생성/이송 유틸은 각자 transaction.atomic 보유
+            with transaction.atomic():
+                rfid_scan_instances = self._process_epc_data(datalist, date_obj)
+                RFIDScan.objects.bulk_create(rfid_scan_instances, batch_size=BULK_BATCH_SIZE)
 
             if validated_data['type_name'] == "재고":
                 result = self._handle_inventory_type(rfid_scan_instances, date_obj)
@@ -420,5 +511,5 @@ class RFIDScanViewSet(QueryParamFilterMixin, viewsets.GenericViewSet):
                 success=False,
                 error=str(e)
             )
-            logger.error(f"RFID bulk_create 에러: {str(e)}")
+            logger.error("RFID bulk_create 에러: %s", e)
             return Response({"status": "error", "message": f"처리 중 오류가 발생했습니다: {str(e)}"}, status=500)
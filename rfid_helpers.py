@@ -3,24 +3,28 @@
 # 쿼리/검수 관련 헬퍼 – 주석 강화
 # -----------------------------
 
+# 검수 비교/이동 계산은 키 + 수량만 사용 → 나머지 컬럼은 로딩하지 않음
+SPEC_TRANSFER_FIELDS = ('id', 'pie_healthcare_num', 'expiry_date', 'medication_lot_number', 'stock_quantity')
+
+
 def get_outgoing_specifications(date_obj, company_obj):
     """특정 날짜/회사에 기록된 '출고' 타입의 스펙 목록을 반환."""
-    outgoing_type = Type.objects.get(name='출고')
+    outgoing_type = get_type('출고')
     return Specification.objects.filter(
         date__date=date_obj.date,
         date__type=outgoing_type,
         date__company=company_obj
-    )
+    ).only(*SPEC_TRANSFER_FIELDS)
 
 
 def get_inspection_specifications(date_obj):
     """특정 date(A 회사 기준)에 기록된 '검수' 스펙만 조회."""
-    inspection_type = Type.objects.get(name='검수')
+    inspection_type = get_type('검수')
     return Specification.objects.filter(
         date__date=date_obj.date,
         date__company=date_obj.company,
         date__type=inspection_type
-    )
+    ).only(*SPEC_TRANSFER_FIELDS)
 
 
 def get_existing_inventories_for_company(company):
@@ -214,7 +218,7 @@ def apply_transfer_by_match_v2(
                 src.date = from_date_obj
                 to_update_from.append(src)
         else:
-            logger.warning(f"[검수이동] A({from_company.company_name}) 재고 없음: {pie}/{expiry}/{lot} - 이동요청 {qty}")
+            logger.warning("[검수이동] A(%s) 재고 없음: %s/%s/%s - 이동요청 %s", from_company.company_name, pie, expiry, lot, qty)
 
         # --- B에 가산 ---
         dst = to_inv_map.get((pie, expiry, lot))
@@ -236,11 +240,11 @@ def apply_transfer_by_match_v2(
 
     # DB 반영
     if to_update_from:
-        Inventory2.objects.bulk_update(to_update_from, ['stock_quantity', 'date'], batch_size=100)
+        Inventory2.objects.bulk_update(to_update_from, ['stock_quantity', 'date'], batch_size=BULK_BATCH_SIZE)
     if to_update_to:
-        Inventory2.objects.bulk_update(to_update_to, ['stock_quantity', 'date'], batch_size=100)
+        Inventory2.objects.bulk_update(to_update_to, ['stock_quantity', 'date'], batch_size=BULK_BATCH_SIZE)
     if to_create:
-        Inventory2.objects.bulk_create(to_create, batch_size=100)
+        Inventory2.objects.bulk_create(to_create, batch_size=BULK_BATCH_SIZE)
 
     return {
         "success": True,
@@ -280,19 +284,20 @@ def rebuild_current_inventory_from_discrepancy(company: Company, date: Date):
                 adjust_inventory_quantity(current_inventory, discrepancy)
                 if current_inventory.stock_quantity < 0:
                     logger.warning(
-                        f"재고 재구성 중 음수 재고 발생 및 0으로 보정: {key} "
-                        f"이전: {original_quantity}, 조정 후: {current_inventory.stock_quantity}, 불일치: {discrepancy.discrepancy_quantity} ({discrepancy.reason})"
+                        "재고 재구성 중 음수 재고 발생 및 0으로 보정: %s 이전: %s, 조정 후: %s, 불일치: %s (%s)",
+                        key, original_quantity, current_inventory.stock_quantity,
+                        discrepancy.discrepancy_quantity, discrepancy.reason
                     )
                     current_inventory.stock_quantity = 0
                 inventories_to_update.append(current_inventory)
                 updated_count += 1
             else:
                 logger.warning(
-                    f"불일치({discrepancy.reason})에 해당하는 재고({discrepancy.pie_healthcare_num})가 "
-                    f"회사 {company.company_name}의 재고에 없어 업데이트 불가"
+                    "불일치(%s)에 해당하는 재고(%s)가 회사 %s의 재고에 없어 업데이트 불가",
+                    discrepancy.reason, discrepancy.pie_healthcare_num, company.company_name
                 )
         except Exception as e:
-            logger.error(f"재고 재구성 실패: {discrepancy.pie_healthcare_num} - {e}")
+            logger.error("재고 재구성 실패: %s - %s", discrepancy.pie_healthcare_num, e)
             continue
 
     return execute_inventory_rebuild(inventories_to_update, updated_count, len(discrepancies))
@@ -313,13 +318,13 @@ def execute_inventory_rebuild(inventories_to_update, updated_count, total_discre
             Inventory2.objects.bulk_update(
                 inventories_to_update,
                 ['stock_quantity'],
-                batch_size=100
+                batch_size=BULK_BATCH_SIZE
             )
     except Exception as e:
-        logger.error(f"재고 재구성 데이터베이스 저장 실패: {e}")
+        logger.error("재고 재구성 데이터베이스 저장 실패: %s", e)
         return {"success": False, "message": f"재고 재구성 DB 저장 실패: {e}", "updated_inventory": updated_count}
 
-    logger.info(f"재고 재구성 완료: {updated_count}개 재고 업데이트, 총 불일치 {total_discrepancies}개")
+    logger.info("재고 재구성 완료: %s개 재고 업데이트, 총 불일치 %s개", updated_count, total_discrepancies)
     return {
         "status": "재고 재구성 완료",
         "updated_inventory": updated_count,
@@ -1,6 +1,11 @@
+import atexit
+import importlib.util
+import logging.handlers
 import os
+import queue
 from pathlib import Path
 import sys
+import time
 
 import environ
 
@@ -10,8 +15,9 @@ environ.Env.read_env(os.path.join(BASE_DIR, '.env'))
 # 환경변수에서 SECRET_KEY 가져오기 (기본값은 개발용)
 SECRET_KEY = os.environ.get('SECRET_KEY')
 
-ALLOWED_HOSTS = ['*']
-DEBUG = True
+# 운영 기본값은 DEBUG=False (DEBUG=True면 connection.queries에 모든 SQL이 쌓여 장기 실행 워커 메모리가 계속 증가)
+ALLOWED_HOSTS = [host.strip() for host in os.environ.get("ALLOWED_HOSTS", "").split(",") if host.strip()]
+DEBUG = os.environ.get("DEBUG", "").lower() == "true"
 
 CSRF_TRUSTED_ORIGINS = ["*"]
 
@@ -19,22 +25,133 @@ CSRF_USE_SESSIONS = True
 
 ENV_GENERAL = environ
 
+# 테스트 실행 여부 (manage.py test 또는 TESTING=true)
+TESTING = 'test' in sys.argv or os.environ.get('TESTING') == 'true'
+
+
+class DisableMigrations:
+    """
+    MIGRATION_MODULES용: keep에 없는 앱은 마이그레이션 모듈 없음(None)으로 응답.
+    keep에 든 앱은 기본 마이그레이션 모듈을 그대로 재생(제약/인덱스가 마이그레이션에만 있는 앱).
+    """
+
+    def __init__(self, keep=()):
+        self.keep = set(keep)
+
+    def __contains__(self, item):
+        return item not in self.keep
+
+    def __getitem__(self, item):
+        return None
+
+
+def queued_handler(target):
+    """
+    LOGGING 핸들러 팩토리: 콘솔/파일 핸들러(target) 앞에 QueueHandler를 두고,
+    QueueListener 백그라운드 스레드가 실제 출력(stderr/디스크 쓰기)을 담당.
+    요청 스레드는 큐에 레코드만 넣고 바로 반환한다.
+    """
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, target, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)  # 종료 시 남은 레코드 flush
+    return logging.handlers.QueueHandler(log_queue)
+
+
+class BufferedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    레코드마다 flush(write syscall)하지 않는 RotatingFileHandler. flush는 앞단 BatchedMemoryHandler가 배치 단위로 호출.
+    기본 shouldRollover는 레코드마다 seek/tell(버퍼 flush 유발)을 하므로, 쓴 바이트 수를 직접 세어 롤오버를 판단.
+    """
+
+    def _open(self):
+        stream = super()._open()
+        self._bytes_written = os.fstat(stream.fileno()).st_size
+        return stream
+
+    def emit(self, record):
+        try:
+            msg = self.format(record) + self.terminator
+            size = len(msg.encode(self.encoding or 'utf-8', 'replace'))
+            if self.stream is None:
+                self.stream = self._open()
+            if 0 < self.maxBytes <= self._bytes_written + size and self._bytes_written > 0:
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+            self.stream.write(msg)
+            self._bytes_written += size
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+class BatchedMemoryHandler(logging.handlers.MemoryHandler):
+    """
+    레코드를 capacity개(또는 flushLevel 이상 레코드 / flush_interval초 경과)까지 모았다가
+    target에 넘기고 target.flush()를 한 번만 호출 → 디스크 write를 배치로 묶음.
+
+    Note:
+      - flush_interval 경과 여부는 새 레코드가 들어올 때만 확인(타이머 스레드 없음)
+        → 로그가 끊긴 뒤 버퍼에 남은 레코드는 다음 레코드가 오거나 종료 시(logging.shutdown → close)에만 기록됨
+    """
+
+    def __init__(self, capacity, flushLevel=logging.ERROR, target=None, flush_interval=5.0):
+        super().__init__(capacity, flushLevel=flushLevel, target=target)
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+
+    def shouldFlush(self, record):
+        return super().shouldFlush(record) or time.monotonic() - self._last_flush >= self.flush_interval
+
+    def flush(self):
+        self.acquire()
+        try:
+            super().flush()
+            if self.target:
+                self.target.flush()
+            self._last_flush = time.monotonic()
+        finally:
+            self.release()
+
+
+# 로그 디렉토리 생성(경로는 한 번만 계산, 이미 있으면 그대로 사용)
+LOG_DIR = BASE_DIR / "logs"
+LOG_DIR.mkdir(parents=True, exist_ok=True)
+
+# 로그 파일 크기 상한(파일당 50MB × 백업 5개) → 디스크 가득 참으로 인한 쓰기 지연/실패 방지
+LOG_MAX_BYTES = int(os.environ.get("LOG_MAX_BYTES", 50 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.environ.get("LOG_BACKUP_COUNT", 5))
+
+# 운영에서는 WARNING으로 올려 비활성 레벨 로그를 isEnabledFor 단계에서 바로 걸러냄
+INVENTORY2_LOG_LEVEL = os.environ.get("INVENTORY2_LOG_LEVEL", "INFO").upper()
+PERFORMANCE_LOG_LEVEL = os.environ.get("PERFORMANCE_LOG_LEVEL", "INFO").upper()
+
+# 포매터에서 쓰지 않는 레코드 속성은 수집하지 않음(레코드마다 os.getpid()/current_thread() 호출 생략)
+logging.logProcesses = False
+logging.logThreads = False
+logging.logMultiprocessing = False
+
 # 로깅 설정 개선
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
     "formatters": {
         "verbose": {
-            "format": "{levelname} {asctime} {module} {process:d} {thread:d} {message}",
-            "style": "{",
+            "format": "%(levelname)s %(asctime)s %(module)s %(message)s",
+            "style": "%",
+            "validate": False,
         },
         "simple": {
-            "format": "{levelname} {message}",
-            "style": "{",
+            "format": "%(levelname)s %(message)s",
+            "style": "%",
+            "validate": False,
         },
         "detailed": {
-            "format": "{levelname} {asctime} {name} {funcName}:{lineno} {message}",
-            "style": "{",
+            "format": "%(levelname)s %(asctime)s %(name)s %(funcName)s:%(lineno)d %(message)s",
+            "style": "%",
+            "validate": False,
         },
     },
     "handlers": {
@@ -42,66 +159,111 @@ LOGGING = {
             "class": "logging.StreamHandler",
             "formatter": "detailed",
         },
-        "file": {
-            "class": "logging.FileHandler",
-            "filename": os.path.join(BASE_DIR, "logs", "django.log"),
+        # 실제 디스크 핸들러(disk_*) ← 배치 버퍼(file/error_file/performance_file) ← 큐(queued_*) 순으로 연결
+        "disk_file": {
+            "()": BufferedRotatingFileHandler,
+            "filename": str(LOG_DIR / "django.log"),
+            "maxBytes": LOG_MAX_BYTES,
+            "backupCount": LOG_BACKUP_COUNT,
+            "encoding": "utf-8",
+            "delay": True,
             "formatter": "verbose",
         },
-        "error_file": {
-            "class": "logging.FileHandler",
-            "filename": os.path.join(BASE_DIR, "logs", "error.log"),
+        "disk_error_file": {
+            "()": BufferedRotatingFileHandler,
+            "filename": str(LOG_DIR / "error.log"),
+            "maxBytes": LOG_MAX_BYTES,
+            "backupCount": LOG_BACKUP_COUNT,
+            "encoding": "utf-8",
+            "delay": True,
             "formatter": "verbose",
             "level": "ERROR",
         },
-        "performance_file": {
-            "class": "logging.FileHandler",
-            "filename": os.path.join(BASE_DIR, "logs", "performance.log"),
+        "disk_performance_file": {
+            "()": BufferedRotatingFileHandler,
+            "filename": str(LOG_DIR / "performance.log"),
+            "maxBytes": LOG_MAX_BYTES,
+            "backupCount": LOG_BACKUP_COUNT,
+            "encoding": "utf-8",
+            "delay": True,
             "formatter": "detailed",
         },
+        "file": {
+            "()": BatchedMemoryHandler,
+            "capacity": 512,
+            "flushLevel": logging.ERROR,
+            "target": "cfg://handlers.disk_file",
+        },
+        "error_file": {
+            "()": BatchedMemoryHandler,
+            "capacity": 128,
+            "flushLevel": logging.ERROR,
+            "level": "ERROR",
+            "target": "cfg://handlers.disk_error_file",
+        },
+        "performance_file": {
+            "()": BatchedMemoryHandler,
+            "capacity": 1024,
+            "flushLevel": logging.ERROR,
+            "target": "cfg://handlers.disk_performance_file",
+        },
+        # 로거는 아래 queued_* 핸들러에만 연결(실제 콘솔/파일 핸들러는 QueueListener가 사용).
+        # dictConfig는 핸들러를 이름순으로 구성하므로 disk_* → file/error_file/performance_file → queued_* 순서가 보장됨.
+        "queued_console": {
+            "()": queued_handler,
+            "target": "cfg://handlers.console",
+        },
+        "queued_file": {
+            "()": queued_handler,
+            "target": "cfg://handlers.file",
+        },
+        "queued_error_file": {
+            "()": queued_handler,
+            "target": "cfg://handlers.error_file",
+        },
+        "queued_performance_file": {
+            "()": queued_handler,
+            "target": "cfg://handlers.performance_file",
+        },
     },
     "root": {
-        "handlers": ["console", "file"],
+        "handlers": ["queued_console", "queued_file"],
         "level": "INFO",
     },
     "loggers": {
         "django": {
-            "handlers": ["console", "file"],
+            "handlers": ["queued_console", "queued_file"],
             "level": "INFO",
             "propagate": False,
         },
         "django.db.backends": {
-            "handlers": ["console"],
+            "handlers": ["queued_console"],
             "level": "WARNING",  # DB 쿼리 로그는 WARNING만
             "propagate": False,
         },
         "django.request": {
-            "handlers": ["error_file"],
+            "handlers": ["queued_error_file"],
             "level": "ERROR",
             "propagate": False,
         },
         "inventory2": {
-            "handlers": ["console", "file", "performance_file"],
-            "level": "INFO",
+            "handlers": ["queued_console", "queued_file", "queued_performance_file"],
+            "level": INVENTORY2_LOG_LEVEL,
             "propagate": False,
         },
         "core": {
-            "handlers": ["console", "file"],
+            "handlers": ["queued_console", "queued_file"],
             "level": "INFO",
             "propagate": False,
         },
         "performance": {
-            "handlers": ["performance_file"],
-            "level": "INFO",
+            "handlers": ["queued_performance_file"],
+            "level": PERFORMANCE_LOG_LEVEL,
             "propagate": False,
         },
     },
 }
 
-# 로그 디렉토리 생성
-log_dir = os.path.join(BASE_DIR, "logs")
-if not os.path.exists(log_dir):
-    os.makedirs(log_dir)
-
 INSTALLED_APPS = [
     'django.contrib.admin',
     'django.contrib.auth',
@@ -116,7 +278,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'django.middleware.gzip.GZipMiddleware',  # JSON 목록 응답 압축(Vary: Accept-Encoding 자동 추가)
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',  # ETag/Last-Modified 일치 시 304(본문 전송 생략)
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -125,14 +289,31 @@ MIDDLEWARE = [
     'core.monitoring.PerformanceMonitoringMiddleware',  # 성능 모니터링 미들웨어
 ]
 
+# 테스트에서는 큐/배치 로깅 스레드, 성능 모니터링 미들웨어, 스키마 앱을 띄우지 않음(setUp/tearDown 부담 감소)
+if TESTING:
+    LOGGING = {
+        "version": 1,
+        "disable_existing_loggers": True,
+        "root": {"handlers": []},
+    }
+    MIDDLEWARE.remove('core.monitoring.PerformanceMonitoringMiddleware')
+    INSTALLED_APPS.remove('drf_yasg')
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # 템플릿은 프로세스당 최초 1회만 파싱/컴파일 후 메모리에서 재사용 (APP_DIRS와 함께 쓸 수 없어 loaders로 명시)
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -141,7 +322,9 @@ TEMPLATES = [
             ],
             'libraries': {
                 'custom_filters': 'core.custom_filters',
-            }
+            },
+            # 모든 템플릿에서 {% load %} 없이 사용 (기존 {% load custom_filters %}도 그대로 동작)
+            'builtins': ['core.custom_filters'],
         },
     },
 ]
@@ -155,15 +338,33 @@ DB_USER = os.environ.get("DB_USER")
 DB_HOST = os.environ.get("DB_HOST")
 DB_PASSWORD = os.environ.get("DB_PASSWORD")
 DB_PORT = os.environ.get("DB_PORT")
+# psycopg(v3) 커넥션 풀 사용 여부 (opt-in: Django 5.1+, psycopg 3 + psycopg_pool, ENGINE=django.db.backends.postgresql 전용)
+DB_POOL = os.environ.get("DB_POOL", "false").lower() == "true"
+DB_POOL_MIN_SIZE = int(os.environ.get("DB_POOL_MIN_SIZE", 5))
+DB_POOL_MAX_SIZE = int(os.environ.get("DB_POOL_MAX_SIZE", 15))
+DB_POOL_MAX_LIFETIME = int(os.environ.get("DB_POOL_MAX_LIFETIME", 300))
+# PostgreSQL TLS 정책(disable/prefer/require/verify-full 등). 미지정 시 드라이버 기본값
+DB_SSLMODE = os.environ.get("DB_SSLMODE")
+# 쿼리 타임아웃(ms). 미지정 시 설정하지 않음(대량 적재/이월/migrate의 데이터 정리 작업이 끊기지 않도록)
+DB_STATEMENT_TIMEOUT_MS = os.environ.get("DB_STATEMENT_TIMEOUT_MS") or None
+# psycopg 3 서버측 prepared statement 전환 횟수. 빈 값이면 None(비활성, PgBouncer transaction 모드 등)
+DB_PREPARE_THRESHOLD = os.environ.get("DB_PREPARE_THRESHOLD", "5")
+DB_PREPARE_THRESHOLD = int(DB_PREPARE_THRESHOLD) if DB_PREPARE_THRESHOLD else None
+# 스캔→스펙 적재 트랜잭션만 synchronous_commit=off (PostgreSQL 전용, 기본 off; 재고 타입은 스펙~불일치 파이프라인 트랜잭션 전체)
+# 켜면 COMMIT이 WAL fsync를 기다리지 않음 → DB 서버 장애 시 직전 수백 ms 커밋 유실 가능(데이터 정합성은 유지)
+SPEC_INGEST_ASYNC_COMMIT = os.environ.get("SPEC_INGEST_ASYNC_COMMIT", "false").lower() == "true"
 
 # 테스트 환경에서는 SQLite 사용
-if 'test' in sys.argv or os.environ.get('TESTING') == 'true':
+if TESTING:
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': ':memory:',
         }
     }
+    # 마이그레이션을 순서대로 재생하지 않고 현재 모델 정의로 바로 테이블 생성(syncdb 방식)
+    # inventory2는 예외: 유니크 제약(0003/0004)·키 인덱스가 마이그레이션에만 있으므로 테스트 DB에도 재생
+    MIGRATION_MODULES = DisableMigrations(keep=['inventory2'])
 else:
     DATABASES = {
         'default': {
@@ -176,32 +377,95 @@ else:
             'OPTIONS': {
                 'connect_timeout': 10,
             },
-            'CONN_MAX_AGE': 60,  # 연결 풀링
+            'CONN_MAX_AGE': 60,  # 연결 재사용(워커당 1개)
         }
     }
+    if DB_ENGINE == 'django.db.backends.postgresql':
+        if DB_SSLMODE:
+            DATABASES['default']['OPTIONS']['sslmode'] = DB_SSLMODE
+        # pg_stat_activity에서 이 앱의 세션 식별 (+ 지정 시 폭주 쿼리 차단)
+        pg_options = "-c application_name=rfid_django"
+        if DB_STATEMENT_TIMEOUT_MS:
+            pg_options += f" -c statement_timeout={int(DB_STATEMENT_TIMEOUT_MS)}"
+        DATABASES['default']['OPTIONS']['options'] = pg_options
+        # psycopg 3: 같은 쿼리가 N번 실행되면 서버측 prepared statement로 전환(parse/plan 생략)
+        # psycopg2는 이 옵션을 거부하므로 psycopg 3이 설치된 경우에만 전달
+        if importlib.util.find_spec('psycopg'):
+            DATABASES['default']['OPTIONS']['prepare_threshold'] = DB_PREPARE_THRESHOLD
+    if DB_POOL and DB_ENGINE == 'django.db.backends.postgresql':
+        # 워커 내 동시 요청이 연결 수립 비용 없이 풀에서 연결을 빌려 씀.
+        # 풀 사용 시 영구 연결(CONN_MAX_AGE)은 함께 쓸 수 없음.
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': DB_POOL_MIN_SIZE,
+            'max_size': DB_POOL_MAX_SIZE,
+            'max_lifetime': DB_POOL_MAX_LIFETIME,  # 오래된 연결 재생성(recycle)
+            'max_idle': 60,  # 유휴 연결은 min_size까지 축소
+            'timeout': 10,  # 풀 고갈 시 대기 한도
+        }
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+
+# 병렬 실행: python manage.py test --parallel=auto --exclude-tag=transactional
+#           (TransactionTestCase는 @tag('transactional')로 분리, 별도로 --tag=transactional 실행)
+TEST_RUNNER = 'django.test.runner.DiscoverRunner'
 
 # 캐시 설정
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
-        'TIMEOUT': 300,  # 5분
-        'OPTIONS': {
-            'MAX_ENTRIES': 1000,
+# REDIS_URL이 있으면 Redis 공유 캐시(Gunicorn 워커 간 해시/스펙 캐시와 무효화 공유),
+# 없으면(로컬 개발/테스트) 프로세스 단위 LocMemCache
+REDIS_URL = os.environ.get("REDIS_URL")
+CACHE_MAX_BYTES = int(os.environ.get("CACHE_MAX_BYTES", 128 * 1024 * 1024))
+
+if REDIS_URL and not TESTING:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'TIMEOUT': 300,  # 5분
+            'OPTIONS': {
+                'max_connections': int(os.environ.get("REDIS_MAX_CONNECTIONS", 50)),
+            }
+        }
+    }
+    # 세션(CSRF_USE_SESSIONS) 조회도 공유 캐시에서 처리, 쓰기는 DB에도 남겨 Redis 재시작 시에도 유지
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+else:
+    # 항목 수가 아니라 저장된 바이트 합계로 크기 제한(값 크기가 제각각인 해시 맵/스펙 캐시 대응)
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache.ByteBoundedLocMemCache',
+            'LOCATION': 'unique-snowflake',
+            'TIMEOUT': 300,  # 5분
+            'OPTIONS': {
+                'MAX_BYTES': CACHE_MAX_BYTES,
+                'MAX_ENTRIES': 100000,  # 안전장치(실제 제한은 MAX_BYTES)
+            }
         }
     }
-}
 
 # 성능 모니터링 설정
 CACHE_TIMEOUT = 300
 PERFORMANCE_MONITORING = True
 SLOW_QUERY_THRESHOLD = 1.0  # 1초 이상 쿼리 로깅
 
+# JSON 응답 인코딩: drf-orjson-renderer가 설치되어 있으면 C 구현(orjson, bytes 직접 생성) 사용
+if importlib.util.find_spec('drf_orjson_renderer'):
+    JSON_RENDERER = 'drf_orjson_renderer.renderers.ORJSONRenderer'
+    JSON_PARSER = 'drf_orjson_renderer.parsers.ORJSONParser'
+else:
+    JSON_RENDERER = 'rest_framework.renderers.JSONRenderer'
+    JSON_PARSER = 'rest_framework.parsers.JSONParser'
+
 REST_FRAMEWORK = {
+    # 전역 기본은 페이지 번호 방식(프론트/기존 목록이 ?page=와 count 사용). 대용량 테이블 뷰셋만 IdCursorPagination 지정
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 40,
     'DEFAULT_THROTTLE_CLASSES': [],
     'DEFAULT_THROTTLE_RATES': {},
+    'DEFAULT_RENDERER_CLASSES': [JSON_RENDERER] + (['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
+    'DEFAULT_PARSER_CLASSES': [
+        JSON_PARSER,
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -230,6 +494,14 @@ USE_I18N = True
 USE_TZ = True
 
 STATIC_URL = 'static/'
+# whitenoise가 설치되어 있으면 정적 파일을 압축본(gzip/br)과 함께 서빙
+if importlib.util.find_spec('whitenoise'):
+    MIDDLEWARE.insert(MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1,
+                      'whitenoise.middleware.WhiteNoiseMiddleware')
+    STORAGES = {
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedStaticFilesStorage'},
+    }
 STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 STATICFILES_DIRS = (os.path.join(BASE_DIR, "static"),)
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
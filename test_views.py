@@ -1,9 +1,18 @@
 """
 뷰 함수들의 통합 테스트
+
+실행:
+  python manage.py test --parallel=auto --keepdb
+  - 모든 클래스는 TestCase + setUpTestData(클래스 단위 픽스처, 테스트마다 savepoint 롤백)
+  - 모듈 로드 시 DB 접근 없음, 특정 auto-increment pk 값에 의존하지 않음(항상 생성한 객체의 id 사용)
+  - 캐시는 TESTING에서 프로세스별 LocMem → 병렬 워커 간 공유 상태 없음
+  - --keepdb는 PostgreSQL 테스트 DB에서 스키마 재생성을 생략(TESTING 기본 SQLite :memory:에서는 영향 없음)
 """
 import json
 from datetime import datetime, date
-from django.test import TestCase, TransactionTestCase, Client
+from unittest.mock import patch
+from django.db import IntegrityError, transaction
+from django.test import TestCase
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -14,45 +23,55 @@ from inventory2.backend.models.specification import Specification
 from inventory2.backend.models.discrepancy import InventoryDiscrepancy
 from inventory2.backend.models.manufacturinghash import ManufacturingHash
 from inventory2.backend.models.rfidscan import RFIDScan, EPCdata
+from inventory2.backend.utils.utils import get_type
+
+
+def _create_base_graph(type_names=("재고",)):
+    """
+    Type/Company/Date 기본 그래프를 최소 쿼리로 생성 (setUpTestData에서 사용).
+    - Type: bulk_create 1회 + in_bulk 조회 1회 (ignore_conflicts는 pk를 채우지 않으므로 재조회)
+    - Company.available_type: through 모델 bulk_create 1회 (.add()의 기존 연결 SELECT 생략)
+    - Date: 첫 번째 타입 기준 2024-12-01
+
+    Returns:
+      (types: dict[name → Type], company, date_obj)
+    """
+    Type.objects.bulk_create([Type(name=name) for name in type_names], ignore_conflicts=True)
+    types = Type.objects.in_bulk(type_names, field_name='name')
+    get_type.cache_clear()  # bulk_create는 post_save를 보내지 않으므로 get_type 캐시를 직접 비움
+
+    company = Company.objects.create(company_name="테스트병원", company_code="TEST001")
+    through = Company.available_type.through
+    through.objects.bulk_create([through(company=company, type=types[name]) for name in type_names])
+
+    date_obj = Date.objects.create(date=date(2024, 12, 1), company=company, type=types[type_names[0]])
+    return types, company, date_obj
 
 
-class RFIDScanViewSetTestCase(TransactionTestCase):
+class RFIDScanViewSetTestCase(TestCase):
     """RFID 스캔 뷰셋 테스트"""
 
-    def setUp(self):
-        """테스트 데이터 설정"""
-        self.client = APIClient()
-        
-        # 기본 데이터 생성 (get_or_create 사용)
-        self.type_obj, _ = Type.objects.get_or_create(name="재고")
-        self.outgoing_type, _ = Type.objects.get_or_create(name="출고")
-        self.inspection_type, _ = Type.objects.get_or_create(name="검수")
-        
-        self.company_obj, _ = Company.objects.get_or_create(
-            company_name="테스트병원",
-            company_code="TEST001"
-        )
-        # many-to-many 필드는 별도로 설정
-        self.company_obj.available_type.add(self.type_obj, self.outgoing_type, self.inspection_type)
-        
-        self.date_obj, _ = Date.objects.get_or_create(
-            date=date(2024, 12, 1),
-            company=self.company_obj,
-            type=self.type_obj
-        )
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        """테스트 데이터 설정 (클래스당 1회 생성, 테스트마다 savepoint 롤백)"""
+        # 기본 데이터 생성 (Type/Company/Date + 회사-타입 연결)
+        types, cls.company_obj, cls.date_obj = _create_base_graph(("재고", "출고", "검수"))
+        cls.type_obj, cls.outgoing_type, cls.inspection_type = types["재고"], types["출고"], types["검수"]
         
         # 기본 재고 데이터 생성
-        self.inventory, _ = Inventory2.objects.get_or_create(
+        cls.inventory = Inventory2.objects.create(
             pie_healthcare_num="12345",
             medication_name="테스트약품",
             expiry_date=date(2025, 12, 31),
             stock_quantity=100,
             medication_lot_number="LOT001",
-            date=self.date_obj
+            date=cls.date_obj
         )
         
         # 해시 데이터 생성
-        self.hash_obj, _ = ManufacturingHash.objects.get_or_create(
+        cls.hash_obj = ManufacturingHash.objects.create(
             original_code="LOT001",
             hashed_code="ABC123DEF"
         )
@@ -135,6 +154,30 @@ class RFIDScanViewSetTestCase(TransactionTestCase):
         self.assertIn("status", response.data)
         self.assertEqual(response.data["status"], "검수 완료")
 
+    def test_inventory_pipeline_rolls_back_on_phase_failure(self):
+        """재고 파이프라인: 재고 반영 단계가 실패하면 앞서 만든 스펙까지 롤백하고 불일치 계산은 건너뜀"""
+        from inventory2.backend.views.rfidscan import RFIDScanViewSet
+
+        def create_specs(instances, operation_type):
+            Specification.objects.create(
+                date=self.date_obj,
+                pie_healthcare_num="12345",
+                expiry_date=date(2025, 12, 31),
+                stock_quantity=30,
+                medication_lot_number="LOT001"
+            )
+            return {"success": True, "created": 1}
+
+        with patch('inventory2.backend.views.rfidscan.create_specifications_from_rfid_scan', side_effect=create_specs), \
+                patch('inventory2.backend.views.rfidscan.update_inventory_from_specifications',
+                      return_value={"success": False, "message": "실패"}), \
+                patch('inventory2.backend.views.rfidscan.execute_discrepancy_check') as mock_discrepancy:
+            result = RFIDScanViewSet()._handle_inventory_type([], self.date_obj)
+
+        self.assertEqual(result["status"], "재고조사 실패(재고 반영)")
+        mock_discrepancy.assert_not_called()
+        self.assertFalse(Specification.objects.filter(date=self.date_obj).exists())
+
     def test_bulk_create_no_data(self):
         """데이터가 없는 경우 테스트"""
         url = reverse('rfidscan-bulk_create')
@@ -270,27 +313,17 @@ class RFIDScanViewSetTestCase(TransactionTestCase):
 class RFIDScanListTestCase(TestCase):
     """RFID 스캔 리스트 뷰 테스트"""
 
-    def setUp(self):
-        """테스트 데이터 설정"""
-        self.client = APIClient()
-        
-        self.type_obj, _ = Type.objects.get_or_create(name="재고")
-        self.company_obj, _ = Company.objects.get_or_create(
-            company_name="테스트병원",
-            company_code="TEST001"
-        )
-        # many-to-many 필드는 별도로 설정
-        self.company_obj.available_type.add(self.type_obj)
-        
-        self.date_obj, _ = Date.objects.get_or_create(
-            date=date(2024, 12, 1),
-            company=self.company_obj,
-            type=self.type_obj
-        )
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        """테스트 데이터 설정 (클래스당 1회 생성, 테스트마다 savepoint 롤백)"""
+        types, cls.company_obj, cls.date_obj = _create_base_graph()
+        cls.type_obj = types["재고"]
         
         # RFID 스캔 데이터 생성
-        self.rfid_scan, _ = RFIDScan.objects.get_or_create(
-            date=self.date_obj,
+        cls.rfid_scan = RFIDScan.objects.create(
+            date=cls.date_obj,
             pie_healthcare_num="12345",
             expiry_date=date(2025, 12, 31),
             scanned_quantity=30,
@@ -357,10 +390,10 @@ class RFIDScanListTestCase(TestCase):
 class BranchingModalTests(TestCase):
     """브랜칭 모달 관련 테스트"""
 
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """테스트 데이터 설정"""
-        self.client = Client()
-        self.type_obj, _ = Type.objects.get_or_create(name="재고")
+        cls.type_obj = Type.objects.create(name="재고")
 
     def test_modal_shows_on_missing_params(self):
         """필수 파라미터가 없을 때 모달이 표시되는지 테스트"""
@@ -391,31 +424,22 @@ class BranchingModalTests(TestCase):
 class DuplicateHandlingTestCase(TestCase):
     """중복 처리 로직 테스트"""
 
-    def setUp(self):
-        """테스트 데이터 설정"""
-        self.client = APIClient()
-        
-        self.type_obj, _ = Type.objects.get_or_create(name="재고")
-        self.company_obj, _ = Company.objects.get_or_create(
-            company_name="테스트병원",
-            company_code="TEST001"
-        )
-        self.company_obj.available_type.add(self.type_obj)
-        
-        self.date_obj, _ = Date.objects.get_or_create(
-            date=date(2024, 12, 1),
-            company=self.company_obj,
-            type=self.type_obj
-        )
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        """테스트 데이터 설정 (클래스당 1회 생성, 테스트마다 savepoint 롤백)"""
+        types, cls.company_obj, cls.date_obj = _create_base_graph()
+        cls.type_obj = types["재고"]
         
         # 기본 재고 데이터 생성
-        self.inventory, _ = Inventory2.objects.get_or_create(
+        cls.inventory = Inventory2.objects.create(
             pie_healthcare_num="12345",
             medication_name="테스트약품",
             expiry_date=date(2025, 12, 31),
             stock_quantity=100,
             medication_lot_number="LOT001",
-            date=self.date_obj
+            date=cls.date_obj
         )
 
     def test_duplicate_epc_handling(self):
@@ -437,6 +461,30 @@ class DuplicateHandlingTestCase(TestCase):
         # 중복 처리 확인
         self.assertIn("status", response.data)
 
+    def test_same_epc_rescanned_is_stored_once(self):
+        """같은 날짜에 같은 EPC를 두 번 스캔해도 EPCdata는 1건만 저장 (uniq_epcdata_date_data)"""
+        epc_data = "000012345250131ABC123DEF"
+
+        url = reverse('rfidscan-bulk_create')
+        data = {
+            "a": [epc_data],
+            "company": "테스트병원",
+            "code": "TEST001",
+            "type": "재고",
+            "date": "20241201"
+        }
+
+        for _ in range(2):
+            response = self.client.post(url, data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        stored = EPCdata.objects.filter(data=epc_data)
+        self.assertEqual(stored.count(), 1)
+
+        # 제약이 테스트 DB에도 있어야 함 (마이그레이션 재생 확인)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            EPCdata.objects.create(date=stored.get().date, data=epc_data)
+
     def test_inventory_overwrite_mode(self):
         """재고 덮어쓰기 모드 테스트"""
         epc_data = "000012345250131ABC123DEF"
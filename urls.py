@@ -26,15 +26,18 @@ schema_view = get_schema_view(
     permission_classes=(permissions.AllowAny,),
 )
 
+# 스키마는 배포 사이에 바뀌지 않으므로 생성 결과를 캐시(요청마다 전체 뷰/시리얼라이저 introspection 방지)
+SCHEMA_CACHE = {
+    'cache_timeout': getattr(settings, 'SCHEMA_CACHE_TIMEOUT', 3600),
+    'cache_kwargs': {'key_prefix': 'oapi'},
+}
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include("inventory2.backend.apis.apis")),
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    path('swagger/', schema_view.with_ui('swagger', **SCHEMA_CACHE), name='schema-swagger-ui'),
+    path('redoc/', schema_view.with_ui('redoc', **SCHEMA_CACHE), name='schema-redoc'),
     path('', include('inventory2.front.urls')),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT) + static(settings.STATIC_URL,
                                                                                         document_root=settings.STATIC_ROOT)
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL,
-                          document_root=settings.MEDIA_ROOT)
+# static()은 DEBUG일 때만 패턴을 돌려줌(운영에서는 빈 리스트) → 운영 media/static은 웹서버/whitenoise가 서빙
@@ -18,12 +18,16 @@ RFID 기반 재고 시스템의 핵심 유틸 함수 모음.
 - 재사용: 단일 인스턴스 처리 → 배치 집계 구조, 헬퍼 함수로 분리
 """
 
-from datetime import datetime
+from datetime import date, datetime
 from functools import lru_cache
+from itertools import islice
 
 from django.core.cache import cache
-from django.db import transaction
-from django.db.models import Q, F, Prefetch
+from django.db import IntegrityError, connection, transaction
+from django.db.models import BooleanField, Case, Q, OuterRef, QuerySet, Subquery, When
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.conf import settings
 
 from core.logger import logger
@@ -31,7 +35,7 @@ from core.exceptions import (
     SpecificationCreationError, DiscrepancyCalculationError,
     DateFormatError, DatabaseOperationError
 )
-from inventory2.backend.models.base import Date
+from inventory2.backend.models.base import Date, Type
 from inventory2.backend.models.discrepancy import InventoryDiscrepancy
 from inventory2.backend.models.inventory import Inventory2
 from inventory2.backend.models.manufacturinghash import ManufacturingHash
@@ -44,13 +48,21 @@ import hashlib
 # =========================
 MAX_HASH_ATTEMPTS = 10000  # 제조번호 해시 충돌 회피를 위해 시도할 최대 횟수
 HASH_LENGTH = 9            # EPC 내 해시 길이(고정)
+HASH_PROBE_BATCH = 16      # 해시 후보 사용 여부를 한 번의 IN 조회로 확인할 개수
 MIN_EXPIRY_DATE = datetime(2025, 1, 1).date()     # 유효한 최소 유통기한 (안전장치)
 MAX_EXPIRY_DATE = datetime(2100, 12, 31).date()   # 유효한 최대 유통기한
 
 # 캐시 기본 설정
 CACHE_TIMEOUT = getattr(settings, 'CACHE_TIMEOUT', 300)  # seconds
 HASH_CACHE_KEY = 'manufacturing_hash_map'                # {hashed_code: original_code}
-SPEC_CACHE_KEY = 'specification_map_{date_id}'           # (pie, expiry, lot) → Spec
+HASH_CACHE_TIMEOUT = getattr(settings, 'HASH_CACHE_TIMEOUT', 3600)  # 해시는 사실상 정적 데이터 + 저장/삭제 시 무효화
+HASH_CODE_CACHE_KEY = 'manufacturing_hash:{}'             # original_code → ManufacturingHash
+BULK_BATCH_SIZE = 1000                                    # bulk_create/bulk_update 1문장당 최대 row 수 (공통)
+OUTGOING_KEY_CHUNK = BULK_BATCH_SIZE // 3                 # 출고 키 조회 1회당 키 수 (키당 파라미터 3개)
+SPEC_INGEST_ASYNC_COMMIT = getattr(settings, 'SPEC_INGEST_ASYNC_COMMIT', False)  # 스캔 적재 시 synchronous_commit=off
+INVENTORY_SNAPSHOT_FIELDS = [                             # 재고 덮어쓰기 시 스펙 값으로 갱신하는 컬럼
+    'stock_quantity', 'medication_name', 'medication_size', 'stock_location', 'medication_created_by'
+]
 
 # 재고 업데이트 모드(가독성 목적. 현재 코드에선 직접 문자열 사용)
 STOCK_UPDATE_MODE_OVERWRITE = 'overwrite'
@@ -62,62 +74,27 @@ STOCK_UPDATE_MODE_DEDUCT = 'deduct'
 # 재고/스펙 조회 최적화 파트
 # =============================================================================
 
-@lru_cache(maxsize=128)
-def get_inventory_for_specifications(specs):
-    """
-    주어진 스펙 묶음에 해당하는 재고를 '한 번에' 가져온다. (L2 캐시 - 프로세스 단위)
-
-    Why:
-      - 스펙별로 재고를 매번 조회하면 N+1 발생.
-      - 공통 키(제품코드/유통기한/LOT)를 추려 한 번에 가져오면 DB round-trip 최소화.
-
-    Returns:
-      QuerySet(Inventory2): 필요한 최소 필드만 골라서 반환.
-    """
-    # 빈 리스트 방어는 상위 호출부에서 처리(필요 시 여기서도 guard 가능)
-    pie_nums = [s.pie_healthcare_num for s in specs]
-    expiry_dates = [s.expiry_date for s in specs]
-    lot_numbers = [s.medication_lot_number for s in specs]
-
-    return Inventory2.objects.filter(
-        Q(pie_healthcare_num__in=pie_nums),
-        Q(expiry_date__in=expiry_dates),
-        Q(medication_lot_number__in=lot_numbers)
-    ).select_related('date').only(
-        'stock_quantity', 'pie_healthcare_num', 'expiry_date',
-        'medication_lot_number', 'date'
-    )
-
-
 def _get_existing_specs_map(rfid_scan_instances):
     """
-    동일 날짜(Date) 내에서 이미 존재하는 스펙을 캐시/DB에서 조회해
+    동일 날짜(Date) 내에서 이미 존재하는 스펙을 DB에서 조회해
     (pie, expiry, lot) → Spec 으로 매핑 반환.
 
-    캐시 전략:
-      - 키: SPEC_CACHE_KEY(date_id)
-      - 값: dict[(pie, expiry, lot)] = Spec
-      - 동일 Date에서 여러 번 스캔/요청이 올 수 있어 캐시 히트율이 높음.
+    - 청크마다 호출되며 직전 청크 저장분까지 봐야 하므로 캐시하지 않음(SELECT 1회)
+    - 값: dict[(pie, expiry, lot)] = Spec
     """
-    # 모든 인스턴스는 같은 Date를 가정(상위 계층 보장)
-    date_obj = rfid_scan_instances[0].date
-    cache_key = SPEC_CACHE_KEY.format(date_id=date_obj.id)
-
-    # 1) 캐시 조회
-    cached_specs = cache.get(cache_key)
-    if cached_specs is not None:
-        logger.info(f"[SpecMap] cache hit: {len(cached_specs)} entries")
-        return cached_specs
+    # 모든 인스턴스는 같은 Date를 가정(상위 계층 보장). date_id만 사용 → FK 객체 지연 로딩 없음
+    date_id = rfid_scan_instances[0].date_id
 
-    # 2) DB 조회 (동일 날짜 + 대상 pie/expiry 범위 제한)
+    # 동일 날짜 + 대상 pie/expiry 범위 제한
     pie_nums = [r.pie_healthcare_num for r in rfid_scan_instances]
     expiry_dates = [r.expiry_date for r in rfid_scan_instances]
 
     existing_specs = Specification.objects.filter(
+        date_id=date_id,  # spec_lookup_idx(date, pie, expiry, lot) 선두 컬럼 순서와 맞춤
         pie_healthcare_num__in=pie_nums,
-        expiry_date__in=expiry_dates,
-        date=date_obj
-    ).select_related('date').only(
+        expiry_date__in=expiry_dates
+    ).only(
+        # 'date'는 date_id 컬럼만 로딩(JOIN 없음). 스펙의 date는 갱신 시 date_id로만 덮어씀
         'pie_healthcare_num', 'expiry_date', 'medication_lot_number',
         'stock_quantity', 'date'
     )
@@ -127,57 +104,98 @@ def _get_existing_specs_map(rfid_scan_instances):
         for s in existing_specs
     }
 
-    cache.set(cache_key, spec_map, CACHE_TIMEOUT)
-    logger.info(f"[SpecMap] db load: {len(existing_specs)} entries (cached)")
+    logger.info("[SpecMap] db load: %s entries", len(spec_map))
     return spec_map
 
 
+def _key_tuple_in(model, keys):
+    """
+    (pie, expiry, lot) 키 목록을 '(pie, expiry, lot) IN (VALUES ...)' 단일 조건(Q)으로 변환.
+
+    - 컬럼별 __in 3개를 AND 하면 교차 조합(|A|·|B|·|C|)까지 매칭되므로, 실제 키 조합만 매칭
+    - row value IN은 PostgreSQL / SQLite(3.15+) 모두 지원
+    - NULL은 '=' 비교가 안 되므로 pie/expiry가 없는 키는 제외(기존 __in과 동일),
+      lot이 없는 키는 '(pie, expiry) IN (VALUES ...)' 하나로 묶어 매칭
+    - 키당 파라미터 3개 → 호출자가 키 수를 제한(SQLite 변수 한도 999)
+    """
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+
+    def columns(*names):
+        return ", ".join(f"{table}.{qn(model._meta.get_field(name).column)}" for name in names)
+
+    def row_in(names, rows):
+        values = ", ".join([f"({', '.join(['%s'] * len(names))})"] * len(rows))
+        params = [value for row in rows for value in row]
+        return Q(RawSQL(f"({columns(*names)}) IN (VALUES {values})", params, output_field=BooleanField()))
+
+    full_keys, lotless_keys = [], {}
+    for pie, expiry, lot in dict.fromkeys(keys):
+        if pie is None or expiry is None:
+            continue
+        if lot:
+            full_keys.append((pie, expiry, lot))
+        else:
+            lotless_keys[(pie, expiry)] = None
+
+    condition = Q(pk__in=[])  # 키가 없으면 아무것도 매칭하지 않음
+    if full_keys:
+        condition |= row_in(('pie_healthcare_num', 'expiry_date', 'medication_lot_number'), full_keys)
+    if lotless_keys:
+        condition |= row_in(('pie_healthcare_num', 'expiry_date'), list(lotless_keys))
+    return condition
+
+
 def _get_default_inventory_filters(rfid_scan_instances):
     """
     RFID 스캔 묶음에서 공통적으로 필요한 재고(Inventory2)를 한 번에 찾기 위한 Q 필터 생성.
 
     Note:
-      - LOT이 없는(미매핑) 케이스는 제외 가능(현epc 재 구현은 None 제외).
+      - 스캔에 실제로 있는 (pie, expiry, lot) 조합만 매칭(_key_tuple_in).
+      - LOT이 없는(미매핑) 스캔은 (pie, expiry)로만 매칭.
       - 이후 _get_optimized_inventory_queryset와 함께 사용.
     """
-    pie_nums = [s.pie_healthcare_num for s in rfid_scan_instances]
-    expiry_dates = [s.expiry_date for s in rfid_scan_instances]
-
-    filters = Q(pie_healthcare_num__in=pie_nums) & Q(expiry_date__in=expiry_dates)
-
-    # LOT이 유효한 것만 포함 (미매핑/None 제거)
-    non_null_lots = [s.medication_lot_number for s in rfid_scan_instances if s.medication_lot_number]
-    if non_null_lots:
-        filters &= Q(medication_lot_number__in=non_null_lots)
-
-    return filters
+    return _key_tuple_in(Inventory2, (
+        (s.pie_healthcare_num, s.expiry_date, s.medication_lot_number)
+        for s in rfid_scan_instances
+    ))
 
 
 def _get_optimized_inventory_queryset(filters):
     """
     앞서 만든 Q로 재고를 최적화된 형태로 가져온다.
-      - select_related('date', 'date__company', 'date__type')로 조인 최소화
+      - JOIN 없음('date'는 date_id 컬럼만 로딩) → 스펙 메타정보(이름/규격/위치/제조사) 조회용
+        (Date 객체가 필요한 조회는 호출부에서 select_related('date') 추가)
       - only(...)로 필요한 컬럼만 로드 → 메모리/네트워크 절약
     """
-    return Inventory2.objects.filter(filters).select_related(
-        'date', 'date__company', 'date__type'
-    ).only(
+    return Inventory2.objects.filter(filters).only(
         'pie_healthcare_num', 'medication_name', 'medication_size',
         'stock_location', 'medication_created_by', 'date'
     )
 
 
+def _get_default_inventory_map(rfid_scan_instances):
+    """
+    스캔 묶음의 기본 재고를 1회 조회해 {pie_healthcare_num: Inventory2}로 반환.
+    같은 pie가 여러 행이면 먼저 조회된 행을 사용(메타정보는 pie 단위로 동일).
+    """
+    default_map = {}
+    for inv in _get_optimized_inventory_queryset(_get_default_inventory_filters(rfid_scan_instances)):
+        default_map.setdefault(inv.pie_healthcare_num, inv)
+    return default_map
+
+
 # =============================================================================
 # 스펙 생성/업데이트 파트
 # =============================================================================
 
-def _process_specification_instance(instance, spec_map, default_qs, operation_type="재고"):
+def _process_specification_instance(instance, spec_map, default_map, operation_type="재고"):
     """
     RFIDScan 인스턴스 1개를 스펙으로 변환/업데이트 판단.
 
     흐름:
       1) 해당 키가 존재하는 스펙인지 확인(spec_map)
-      2) 기본 재고(default_qs) 존재 확인(미등록 품목 방지)
+      2) 기본 재고(default_map: pie → 재고) 존재 확인(미등록 품목 방지) — dict 조회, DB 접근 없음
       3) 수량 유효성 검사 (음수/과다)
       4) 중복이면 업데이트, 신규면 새 스펙 생성
 
@@ -186,11 +204,11 @@ def _process_specification_instance(instance, spec_map, default_qs, operation_ty
     """
     try:
         # 기본 재고가 존재하지 않으면 스펙 생성 불가(메타정보 부족)
-        if not default_qs.exists():
-            logger.warning(f"[Spec] 기본 재고 정보 없음 → {instance.pie_healthcare_num}")
+        default = default_map.get(instance.pie_healthcare_num)
+        if default is None:
+            logger.warning("[Spec] 기본 재고 정보 없음 → %s", instance.pie_healthcare_num)
             return None
 
-        default = default_qs.first()  # 동일 키로 조회한 결과(only로 최소 필드 로딩)
         key = (default.pie_healthcare_num, instance.expiry_date, instance.medication_lot_number)
 
         # 수량 sanity check
@@ -210,88 +228,238 @@ def _process_specification_instance(instance, spec_map, default_qs, operation_ty
         return None
 
     except Exception as e:
-        logger.error(f"[Spec] 인스턴스 처리 오류: pie={instance.pie_healthcare_num} err={e}")
+        logger.error("[Spec] 인스턴스 처리 오류: pie=%s err=%s", instance.pie_healthcare_num, e)
         return None
 
 
+def _relax_commit_durability():
+    """
+    현재 트랜잭션에 한해 synchronous_commit=off (SET LOCAL → COMMIT/ROLLBACK 시 자동 원복).
+    SPEC_INGEST_ASYNC_COMMIT 설정 + PostgreSQL일 때만 적용, 그 외 DB는 아무 것도 하지 않음.
+    """
+    if SPEC_INGEST_ASYNC_COMMIT and connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL synchronous_commit TO OFF")
+
+
+def _iter_scan_chunks(rfid_scan_instances, chunk_size):
+    """스캔 묶음(list 또는 QuerySet)을 chunk_size개씩 잘라 list로 내보냄. QuerySet은 iterator로 스트리밍."""
+    if isinstance(rfid_scan_instances, QuerySet):
+        rfid_scan_instances = rfid_scan_instances.iterator(chunk_size=chunk_size)
+    it = iter(rfid_scan_instances)
+    while chunk := list(islice(it, chunk_size)):
+        yield chunk
+
+
+def _save_spec_changes(specs_to_create, specs_to_update):
+    """분류된 신규/갱신 스펙을 bulk_update 1회 + bulk_create 1회(배치당)로 저장."""
+    try:
+        if specs_to_update:
+            Specification.objects.bulk_update(
+                specs_to_update,
+                ['stock_quantity', 'date'],
+                batch_size=BULK_BATCH_SIZE
+            )
+        if specs_to_create:
+            Specification.objects.bulk_create(
+                specs_to_create,
+                batch_size=BULK_BATCH_SIZE,
+                ignore_conflicts=True  # 동일 키 충돌 시 무시(로그로 추적)
+            )
+    except Exception as e:
+        # 트랜잭션 내에서 발생 → 롤백
+        raise DatabaseOperationError(f"스펙 저장 실패: {e}")
+
+
 @transaction.atomic
 def create_specifications_from_rfid_scan(rfid_scan_instances, operation_type="재고"):
     """
     스캔 묶음을 스펙으로 일괄 반영한다(대량 생성/업데이트).
 
     성능 포인트:
-      - 기존 스펙 맵 캐싱
-      - 재고 기본 정보 한 번에 로딩(Q 필터 → QS)
-      - 배치 처리(batch_size)
-      - bulk_create / bulk_update
+      - 입력(list/QuerySet)을 BULK_BATCH_SIZE 청크로 스트리밍 → 메모리는 청크 크기로 제한
+      - 청크마다 기존 스펙 맵(SELECT 1회, 직전 청크 저장분 포함) → 메모리에서 갱신/신규 분류
+      - 재고 기본 정보 청크당 SELECT 1회 → pie 기준 dict(인스턴스마다 exists()/first() 조회 없음)
+      - 같은 청크 내 동일 키 스캔은 방금 만든 신규 스펙에 누적(중복 INSERT 방지)
+      - 청크마다 bulk_update 1회 + bulk_create 1회
+      - 전체가 트랜잭션 1개(COMMIT 1회). SPEC_INGEST_ASYNC_COMMIT이면 그 COMMIT의 fsync 대기 생략
 
     Returns:
       dict: {success, created, updated, processed, skipped, operation_type}
     """
     try:
-        if not rfid_scan_instances:
-            raise SpecificationCreationError("RFID 스캔 데이터가 없습니다.")
-
-        specs_to_create, specs_to_update = [], []
-        spec_map = _get_existing_specs_map(rfid_scan_instances)
-        default_filters = _get_default_inventory_filters(rfid_scan_instances)
-        default_qs = _get_optimized_inventory_queryset(default_filters)
-
-        batch_size = 100
+        _relax_commit_durability()
+        date_id = None
+        created_count = updated_count = 0
         processed_count = 0
         skipped_count = 0
 
-        # 배치 순회
-        for i in range(0, len(rfid_scan_instances), batch_size):
-            batch = rfid_scan_instances[i:i + batch_size]
-
-            for instance in batch:
-                result = _process_specification_instance(instance, spec_map, default_qs, operation_type)
-                if result:
-                    new_spec, update_spec = result
-                    if new_spec:
-                        specs_to_create.append(new_spec)
-                    if update_spec:
-                        specs_to_update.append(update_spec)
-                    processed_count += 1
-                else:
+        for chunk in _iter_scan_chunks(rfid_scan_instances, BULK_BATCH_SIZE):
+            if date_id is None:
+                date_id = chunk[0].date_id
+
+            specs_to_create, specs_to_update = [], {}
+            spec_map = _get_existing_specs_map(chunk)
+            default_map = _get_default_inventory_map(chunk)
+
+            for instance in chunk:
+                result = _process_specification_instance(instance, spec_map, default_map, operation_type)
+                if not result:
                     skipped_count += 1
+                    continue
 
-        # DB 반영 (bulk)
-        try:
-            if specs_to_create:
-                Specification.objects.bulk_create(
-                    specs_to_create,
-                    batch_size=batch_size,
-                    ignore_conflicts=True  # 동일 키 충돌 시 무시(로그로 추적)
-                )
-            if specs_to_update:
-                Specification.objects.bulk_update(
-                    specs_to_update,
-                    ['stock_quantity', 'date'],
-                    batch_size=batch_size
-                )
-        except Exception as e:
-            # 트랜잭션 내에서 발생 → 롤백
-            raise DatabaseOperationError(f"스펙 저장 실패: {e}")
+                new_spec, update_spec = result
+                if new_spec:
+                    specs_to_create.append(new_spec)
+                    # 이후 같은 키 스캔은 이 신규 스펙에 누적되도록 맵에 등록
+                    spec_map[(new_spec.pie_healthcare_num, new_spec.expiry_date, new_spec.medication_lot_number)] = new_spec
+                if update_spec is not None and update_spec.pk is not None:
+                    # 저장 전 신규 스펙은 bulk_create 대상이므로 제외, 같은 스펙 중복 갱신은 1건으로
+                    specs_to_update[update_spec.pk] = update_spec
+                processed_count += 1
+
+            # DB 반영 (bulk) — 다음 청크의 스펙 맵 조회가 이번 저장분을 보도록 청크마다 저장
+            _save_spec_changes(specs_to_create, list(specs_to_update.values()))
+            created_count += len(specs_to_create)
+            updated_count += len(specs_to_update)
+
+        if date_id is None:
+            raise SpecificationCreationError("RFID 스캔 데이터가 없습니다.")
 
         return {
             "success": True,
-            "created": len(specs_to_create),
-            "updated": len(specs_to_update),
+            "created": created_count,
+            "updated": updated_count,
             "processed": processed_count,
             "skipped": skipped_count,
             "operation_type": operation_type
         }
 
     except (SpecificationCreationError, DatabaseOperationError) as e:
-        logger.exception(f"[Spec] 생성 실패: {e}")
+        logger.exception("[Spec] 생성 실패: %s", e)
         return {"success": False, "message": str(e)}
     except Exception as e:
-        logger.exception(f"[Spec] 예기치 못한 오류: {e}")
+        logger.exception("[Spec] 예기치 못한 오류: %s", e)
         return {"success": False, "message": f"예상치 못한 오류: {e}"}
 
 
+def _in_or_null(field, values):
+    """field__in=values 조건. values에 None이 있으면 IS NULL도 포함(= None 필터와 동일한 의미 유지)."""
+    values = set(values)
+    condition = Q(**{f"{field}__in": values - {None}})
+    if None in values:
+        condition |= Q(**{f"{field}__isnull": True})
+    return condition
+
+
+@transaction.atomic
+def _apply_inventory_specs(specs):
+    """
+    재고 스펙 묶음으로 해당 날짜의 재고를 일괄 덮어쓰기(없으면 생성).
+
+    - 기존 update_or_create(스펙당 SELECT + INSERT/UPDATE)와 같은 의미를 SELECT 1회 + bulk 쓰기로 처리
+    - 키: (pie, expiry, lot, date). 키당 id가 가장 작은 재고 1건을 갱신
+    - 같은 키 스펙이 여러 개면 뒤 스펙 값이 최종값(순차 update_or_create와 동일)
+
+    Returns:
+      반영한 스펙 수
+    """
+    keys = {(s.pie_healthcare_num, s.expiry_date, s.medication_lot_number, s.date_id) for s in specs}
+    existing = Inventory2.objects.filter(
+        _in_or_null('pie_healthcare_num', (k[0] for k in keys)),
+        _in_or_null('expiry_date', (k[1] for k in keys)),
+        _in_or_null('medication_lot_number', (k[2] for k in keys)),
+        date_id__in={k[3] for k in keys},
+    ).order_by('id').only('id', 'pie_healthcare_num', 'expiry_date', 'medication_lot_number', 'date')
+
+    inv_by_key = {}
+    for inv in existing:
+        key = (inv.pie_healthcare_num, inv.expiry_date, inv.medication_lot_number, inv.date_id)
+        if key in keys:
+            inv_by_key.setdefault(key, inv)
+
+    to_update, to_create = {}, {}
+    for spec in specs:
+        key = (spec.pie_healthcare_num, spec.expiry_date, spec.medication_lot_number, spec.date_id)
+        inv = inv_by_key.get(key)
+        if inv is None:
+            inv = to_create.get(key) or Inventory2(
+                pie_healthcare_num=spec.pie_healthcare_num,
+                expiry_date=spec.expiry_date,
+                medication_lot_number=spec.medication_lot_number,
+                date_id=spec.date_id,
+            )
+            to_create[key] = inv
+        else:
+            to_update[key] = inv
+        for field in INVENTORY_SNAPSHOT_FIELDS:
+            setattr(inv, field, getattr(spec, field))
+
+    if to_update:
+        Inventory2.objects.bulk_update(
+            to_update.values(), INVENTORY_SNAPSHOT_FIELDS, batch_size=BULK_BATCH_SIZE
+        )
+    if to_create:
+        Inventory2.objects.bulk_create(
+            to_create.values(), batch_size=BULK_BATCH_SIZE, ignore_conflicts=True
+        )
+    return len(specs)
+
+
+@transaction.atomic
+def _apply_outgoing_specs(specs):
+    """
+    출고 스펙 묶음을 재고에서 일괄 차감.
+
+    - 대상 재고: 키(pie, expiry, lot)별 id가 가장 작은 Inventory2 1건 (기존 filter().first()와 동일)
+      (LOT 없는 키는 (pie, expiry)로 넓게 조회 후 아래에서 정확한 키만 남김)
+    - 같은 키 스펙이 여러 개면 순서대로 누적 차감, 음수가 되는 스펙만 실패 처리
+    - 변경된 재고만 bulk_update(stock_quantity)
+    - 조회~저장을 한 트랜잭션에서 select_for_update로 잠금 → 동시 출고 요청의 이중 차감(lost update) 방지
+      (skip_locked는 잠긴 재고를 '재고 없음'으로 오판하므로 사용하지 않고 대기)
+
+    Returns:
+      (updated_count, error_count)
+    """
+    keys = {(s.pie_healthcare_num, s.expiry_date, s.medication_lot_number) for s in specs}
+    inv_by_key = {}
+    # 실제 키 조합만 잠금/조회(row value IN VALUES) — 컬럼별 __in의 교차 조합 행까지 FOR UPDATE로 잠그지 않음
+    # 키당 파라미터 3개 → OUTGOING_KEY_CHUNK개씩 나눠 조회(바인드 변수 한도 안에서)
+    key_iter = iter(keys)
+    while key_chunk := list(islice(key_iter, OUTGOING_KEY_CHUNK)):
+        candidates = Inventory2.objects.select_for_update().filter(
+            _key_tuple_in(Inventory2, key_chunk)
+        ).order_by('id').only('id', 'pie_healthcare_num', 'expiry_date', 'medication_lot_number', 'stock_quantity')
+
+        for inv in candidates:
+            key = (inv.pie_healthcare_num, inv.expiry_date, inv.medication_lot_number)
+            if key in keys:
+                inv_by_key.setdefault(key, inv)
+
+    changed = {}
+    updated_count = error_count = 0
+    for spec in specs:
+        current_inv = inv_by_key.get((spec.pie_healthcare_num, spec.expiry_date, spec.medication_lot_number))
+        if current_inv is None:
+            logger.warning("[출고] 대상 재고 없음: %s", spec.pie_healthcare_num)
+            error_count += 1
+            continue
+
+        new_quantity = current_inv.stock_quantity - abs(spec.stock_quantity)
+        if new_quantity < 0:
+            logger.warning("[출고] 음수 재고 방지: %s → %s", spec.pie_healthcare_num, new_quantity)
+            error_count += 1
+            continue
+
+        current_inv.stock_quantity = new_quantity
+        changed[current_inv.pk] = current_inv
+        updated_count += 1
+
+    if changed:
+        Inventory2.objects.bulk_update(changed.values(), ['stock_quantity'], batch_size=BULK_BATCH_SIZE)
+    return updated_count, error_count
+
+
 def update_inventory_from_specifications(specs, operation_type):
     """
     스펙 → 재고 반영.
@@ -311,53 +479,15 @@ def update_inventory_from_specifications(specs, operation_type):
         updated_count = 0
         error_count = 0
 
-        for spec in specs:
-            try:
-                if operation_type == "재고":
-                    # 재고 스냅샷 개념: 해당 날짜 기준으로 값을 overwrite
-                    Inventory2.objects.update_or_create(
-                        pie_healthcare_num=spec.pie_healthcare_num,
-                        expiry_date=spec.expiry_date,
-                        medication_lot_number=spec.medication_lot_number,
-                        date=spec.date,
-                        defaults={
-                            "stock_quantity": spec.stock_quantity,
-                            "medication_name": spec.medication_name,
-                            "medication_size": spec.medication_size,
-                            "stock_location": spec.stock_location,
-                            "medication_created_by": spec.medication_created_by
-                        }
-                    )
-                    updated_count += 1
-
-                elif operation_type == "출고":
-                    # 출고: 기존 재고에서 차감(음수 방지)
-                    current_inv = Inventory2.objects.filter(
-                        pie_healthcare_num=spec.pie_healthcare_num,
-                        expiry_date=spec.expiry_date,
-                        medication_lot_number=spec.medication_lot_number
-                    ).first()
-
-                    if current_inv:
-                        new_quantity = current_inv.stock_quantity - abs(spec.stock_quantity)
-                        if new_quantity >= 0:
-                            current_inv.stock_quantity = new_quantity
-                            current_inv.save()
-                            updated_count += 1
-                        else:
-                            logger.warning(f"[출고] 음수 재고 방지: {spec.pie_healthcare_num} → {new_quantity}")
-                            error_count += 1
-                    else:
-                        logger.warning(f"[출고] 대상 재고 없음: {spec.pie_healthcare_num}")
-                        error_count += 1
-
-                elif operation_type == "검수":
-                    # 검수는 불일치 처리 파이프라인에서 재고조정
-                    pass
+        if operation_type == "재고":
+            # 재고 스냅샷 개념: 해당 날짜 기준으로 값을 overwrite — SELECT 1회 + bulk_update/bulk_create
+            updated_count = _apply_inventory_specs(specs)
 
-            except Exception as e:
-                logger.error(f"[Inventory] 업데이트 실패: pie={spec.pie_healthcare_num} err={e}")
-                error_count += 1
+        elif operation_type == "출고":
+            # 출고: 기존 재고에서 차감(음수 방지) — SELECT ... FOR UPDATE(키 OUTGOING_KEY_CHUNK개당 1회) + bulk_update 1회
+            updated_count, error_count = _apply_outgoing_specs(specs)
+
+        # 검수는 불일치 처리 파이프라인에서 재고조정(여기서는 반영하지 않음)
 
         return {
             "success": True,
@@ -367,7 +497,7 @@ def update_inventory_from_specifications(specs, operation_type):
         }
 
     except Exception as e:
-        logger.exception(f"[Inventory] 업데이트 실패: {e}")
+        logger.exception("[Inventory] 업데이트 실패: %s", e)
         return {"success": False, "message": str(e)}
 
 
@@ -375,49 +505,92 @@ def update_inventory_from_specifications(specs, operation_type):
 # 불일치(Discrepancy) 계산/저장 파트
 # =============================================================================
 
+def _discrepancy_from_quantities(spec_qty, inv_qty):
+    """
+    스펙 수량 vs 재고 수량 → (reason, discrepancy_quantity). 일치하면 None.
+
+    규칙:
+      - 재고 미존재(inv_qty=None) → ('미존재', spec_qty)
+      - diff = 재고 - 스펙 > 0 → '모자람', < 0 → '초과' (수량은 절대값)
+    """
+    if inv_qty is None:
+        return "미존재", spec_qty
+    diff = inv_qty - spec_qty
+    if diff == 0:
+        return None
+    return ("초과" if diff < 0 else "모자람"), abs(diff)
+
+
 def _calculate_discrepancy_for_spec(spec, inv_map):
     """
     단일 스펙 vs 재고 차이를 바탕으로 불일치 모델 생성.
 
-    규칙:
-      - 재고 미존재 → reason='미존재', qty=spec.qty
-      - 재고와 수량 불일치 → diff>0 → '모자람', diff<0 → '초과'
-      - 정확히 일치 → None 반환
+    규칙은 _discrepancy_from_quantities와 동일(정확히 일치 → None 반환).
     """
     try:
         key = (spec.pie_healthcare_num, spec.expiry_date, spec.medication_lot_number)
         inv = inv_map.get(key)
 
-        if not inv:
-            return InventoryDiscrepancy(
-                date=spec.date,
-                pie_healthcare_num=spec.pie_healthcare_num,
-                medication_lot_number=spec.medication_lot_number,
-                medication_name=spec.medication_name,
-                expiry_date=spec.expiry_date,
-                reason="미존재",
-                discrepancy_quantity=spec.stock_quantity
-            )
+        result = _discrepancy_from_quantities(spec.stock_quantity, inv.stock_quantity if inv else None)
+        if result is None:
+            return None
 
-        diff = inv.stock_quantity - spec.stock_quantity
-        if diff != 0:
-            reason = "초과" if diff < 0 else "모자람"
-            return InventoryDiscrepancy(
-                date=spec.date,
-                pie_healthcare_num=spec.pie_healthcare_num,
-                medication_lot_number=spec.medication_lot_number,
-                medication_name=spec.medication_name,
-                expiry_date=spec.expiry_date,
-                reason=reason,
-                discrepancy_quantity=abs(diff)
-            )
-        return None
+        reason, quantity = result
+        return InventoryDiscrepancy(
+            date=spec.date,
+            pie_healthcare_num=spec.pie_healthcare_num,
+            medication_lot_number=spec.medication_lot_number,
+            medication_name=spec.medication_name,
+            expiry_date=spec.expiry_date,
+            reason=reason,
+            discrepancy_quantity=quantity
+        )
 
     except Exception as e:
-        logger.error(f"[Discrepancy] 계산 실패: pie={spec.pie_healthcare_num} err={e}")
+        logger.error("[Discrepancy] 계산 실패: pie=%s err=%s", spec.pie_healthcare_num, e)
         return None
 
 
+def _get_specs_with_inventory_quantity(specs):
+    """
+    스펙 묶음의 각 스펙에 같은 키(pie, expiry, lot)의 재고 수량(inv_qty)을 붙여 (spec, inv_qty) 목록으로 반환.
+
+    - 상관 서브쿼리: 키당 가장 최근(id 최대) Inventory2 1건의 stock_quantity (없으면 None)
+      LOT이 NULL인 스펙은 '= NULL' 비교가 항상 거짓이므로 LOT이 NULL인 재고와 매칭(isnull 분기)
+    - DB에서는 pk → inv_qty만 조회(SELECT 1회), 스펙 필드는 메모리 값 그대로 사용
+    - 저장되지 않은 스펙(pk 없음)은 조회할 수 없으므로 경고 로그 후 제외
+    """
+    saved = [s for s in specs if s.pk is not None]
+    if len(saved) != len(specs):
+        logger.warning("[Discrepancy] 저장되지 않은 스펙 제외: %s건", len(specs) - len(saved))
+    if not saved:
+        return []
+
+    def latest_inv_qty(lot_q):
+        return Subquery(
+            Inventory2.objects.filter(
+                lot_q,
+                pie_healthcare_num=OuterRef('pie_healthcare_num'),
+                expiry_date=OuterRef('expiry_date'),
+            ).order_by('-id').values('stock_quantity')[:1]
+        )
+
+    inv_qty_by_pk = dict(
+        Specification.objects.filter(
+            pk__in=[s.pk for s in saved]
+        ).annotate(
+            inv_qty=Case(
+                When(
+                    medication_lot_number__isnull=True,
+                    then=latest_inv_qty(Q(medication_lot_number__isnull=True)),
+                ),
+                default=latest_inv_qty(Q(medication_lot_number=OuterRef('medication_lot_number'))),
+            )
+        ).values_list('pk', 'inv_qty')
+    )
+    return [(s, inv_qty_by_pk.get(s.pk)) for s in saved]
+
+
 @transaction.atomic
 def calculate_and_save_discrepancies(specs):
     """
@@ -425,8 +598,8 @@ def calculate_and_save_discrepancies(specs):
 
     단계:
       1) 해당 날짜의 기존 불일치 삭제(시연 반복 대비)
-      2) 스펙 키로 재고 한 번에 조회 → inv_map 구성
-      3) 배치로 순회하며 불일치 생성
+      2) 스펙별 재고 수량을 서브쿼리로 붙여 한 번에 조회
+      3) 행마다 규칙(_discrepancy_from_quantities) 적용해 불일치 생성
       4) bulk_create 저장
 
     Returns:
@@ -441,35 +614,34 @@ def calculate_and_save_discrepancies(specs):
             date_obj = specs[0].date
             InventoryDiscrepancy.objects.filter(date=date_obj).delete()
         except Exception as e:
-            logger.warning(f"[Discrepancy] 기존 데이터 삭제 실패: {e}")
-
-        # 2) 재고 일괄 조회 → 매핑
-        inventories = get_inventory_for_specifications(specs)
-        inv_map = {
-            (i.pie_healthcare_num, i.expiry_date, i.medication_lot_number): i
-            for i in inventories
-        }
+            logger.warning("[Discrepancy] 기존 데이터 삭제 실패: %s", e)
 
+        # 2) 스펙 + 재고 수량을 DB에서 한 번에 조인 조회 → 3) 행 단위 규칙 적용
         discrepancies = []
         reason_counter = {"미존재": 0, "초과": 0, "모자람": 0}
 
-        # 3) 배치 처리
-        batch_size = 100
-        for i in range(0, len(specs), batch_size):
-            batch = specs[i:i + batch_size]
-
-            for spec in batch:
-                d = _calculate_discrepancy_for_spec(spec, inv_map)
-                if d:
-                    discrepancies.append(d)
-                    reason_counter[d.reason] += 1
+        for spec, inv_qty in _get_specs_with_inventory_quantity(specs):
+            result = _discrepancy_from_quantities(spec.stock_quantity, inv_qty)
+            if result is None:
+                continue
+            reason, quantity = result
+            discrepancies.append(InventoryDiscrepancy(
+                date_id=spec.date_id,
+                pie_healthcare_num=spec.pie_healthcare_num,
+                medication_lot_number=spec.medication_lot_number,
+                medication_name=spec.medication_name,
+                expiry_date=spec.expiry_date,
+                reason=reason,
+                discrepancy_quantity=quantity
+            ))
+            reason_counter[reason] += 1
 
         # 4) 저장
         if discrepancies:
             try:
                 InventoryDiscrepancy.objects.bulk_create(
                     discrepancies,
-                    batch_size=batch_size,
+                    batch_size=BULK_BATCH_SIZE,
                     ignore_conflicts=True
                 )
             except Exception as e:
@@ -482,10 +654,10 @@ def calculate_and_save_discrepancies(specs):
         }
 
     except (DiscrepancyCalculationError, DatabaseOperationError) as e:
-        logger.exception(f"[Discrepancy] 계산 실패: {e}")
+        logger.exception("[Discrepancy] 계산 실패: %s", e)
         return {"success": False, "message": str(e)}
     except Exception as e:
-        logger.exception(f"[Discrepancy] 예기치 못한 오류: {e}")
+        logger.exception("[Discrepancy] 예기치 못한 오류: %s", e)
         return {"success": False, "message": f"예상치 못한 오류: {e}"}
 
 
@@ -503,21 +675,51 @@ def _get_cached_hash_map(hashed_codes):
     hashed_code 목록에 대해 캐시/DB에서 original_code 매핑을 조회.
 
     캐시 정책:
-      - HASH_CACHE_KEY에 전체 맵을 저장.
-      - 필요 목록만 잘라 사용(부분 dict 생성).
-      - 생성/추가 시 cache 무효화(get_or_create_hash)로 일관성 유지.
+      - HASH_CACHE_KEY에 ManufacturingHash '전체' 맵을 저장(미스 시 테이블 1회 로딩).
+      - 요청된 코드만 잘라 반환(부분 dict 생성). 매핑 없는 코드는 결과에서 빠짐.
+      - ManufacturingHash 저장/삭제 시 post_save/post_delete 시그널로 무효화.
     """
-    cached_map = cache.get(HASH_CACHE_KEY)
-    if cached_map is not None:
-        return {k: v for k, v in cached_map.items() if k in hashed_codes}
+    hash_map = cache.get(HASH_CACHE_KEY)
+    if hash_map is None:
+        hash_map = dict(ManufacturingHash.objects.values_list('hashed_code', 'original_code'))
+        cache.set(HASH_CACHE_KEY, hash_map, HASH_CACHE_TIMEOUT)
+        logger.info("[HashMap] db load: %s entries (cached)", len(hash_map))
 
-    hash_objects = ManufacturingHash.objects.filter(
-        hashed_code__in=hashed_codes
-    ).values('hashed_code', 'original_code')
+    return {h: hash_map[h] for h in set(hashed_codes) if h in hash_map}
 
-    hash_map = {h['hashed_code']: h['original_code'] for h in hash_objects}
-    cache.set(HASH_CACHE_KEY, hash_map, CACHE_TIMEOUT)
-    return hash_map
+
+@receiver([post_save, post_delete], sender=ManufacturingHash)
+def _invalidate_hash_cache(sender, instance, **kwargs):
+    """해시 매핑이 바뀌면(관리자 수정 포함) 전체 맵 캐시 + 해당 제조번호 조회 캐시를 무효화."""
+    cache.delete_many([HASH_CACHE_KEY, HASH_CODE_CACHE_KEY.format(instance.original_code)])
+
+
+def _get_hash_by_code(code):
+    """
+    original_code → ManufacturingHash (Django 캐시 read-through, 매핑이 없으면 None).
+
+    공유 캐시(HASH_CODE_CACHE_KEY)에 저장하므로 무효화가 모든 워커에 적용되고,
+    캐시에서 꺼낸 값은 호출마다 새 인스턴스(호출자 간 공유 없음).
+    """
+    key = HASH_CODE_CACHE_KEY.format(code)
+    hash_obj = cache.get(key)
+    if hash_obj is None:
+        hash_obj = ManufacturingHash.objects.filter(original_code=code).first()
+        if hash_obj is not None:
+            cache.set(key, hash_obj, HASH_CACHE_TIMEOUT)
+    return hash_obj
+
+
+def _iter_hash_candidates(code, max_attempts):
+    """
+    salt f"{code}:{i}" → sha256 상위 HASH_LENGTH(9) 대문자 후보를 순서대로 생성.
+    code까지 해시한 상태를 1회 계산해 copy() → 시도마다 ":{i}"만 추가로 해시(결과는 동일).
+    """
+    base = hashlib.sha256(code.encode(), usedforsecurity=False)  # 식별용 해시(보안 목적 아님)
+    for i in range(max_attempts):
+        h = base.copy()
+        h.update(f":{i}".encode())
+        yield h.hexdigest()[:HASH_LENGTH].upper()
 
 
 def generate_hash_for_manufacturing_code(code, max_attempts=MAX_HASH_ATTEMPTS):
@@ -527,23 +729,24 @@ def generate_hash_for_manufacturing_code(code, max_attempts=MAX_HASH_ATTEMPTS):
     방식:
       - salt: f"{code}:{i}"
       - sha256 → 상위 HASH_LENGTH(9) 대문자
-      - 기존 해시 목록과 충돌 없는 값 선택
+      - 후보를 HASH_PROBE_BATCH개씩 hashed_code__in(unique 인덱스)으로 확인 → 사용 중이 아닌 첫 후보 선택
+        (전체 해시 테이블을 읽지 않음. 충돌이 없으면 SELECT 1회)
 
     Note:
       - 해시 공간이 제한적이라 이론상 충돌 가능성 존재 → max_attempts로 안전장치
+      - 선택~저장 사이 경합은 get_or_create_hash가 unique 제약(IntegrityError)으로 처리
     """
     if not code:
         raise ValueError("제조번호가 비어있습니다.")
 
-    existing_hashes = set(
-        ManufacturingHash.objects.values_list("hashed_code", flat=True)
-    )
-
-    for i in range(max_attempts):
-        salt = f"{code}:{i}"
-        hashed = hashlib.sha256(salt.encode()).hexdigest()[:HASH_LENGTH].upper()
-        if hashed not in existing_hashes:
-            return hashed
+    candidates = _iter_hash_candidates(code, max_attempts)
+    while batch := list(islice(candidates, HASH_PROBE_BATCH)):
+        taken = set(
+            ManufacturingHash.objects.filter(hashed_code__in=batch).values_list("hashed_code", flat=True)
+        )
+        for hashed in batch:
+            if hashed not in taken:
+                return hashed
 
     raise Exception("제조번호 해시 생성 실패: 충돌 한도 초과")
 
@@ -552,40 +755,112 @@ def get_or_create_hash(code):
     """
     original_code 기준으로 해시 객체 조회 또는 신규 생성.
 
+    - 후보 해시로 바로 INSERT 시도(probe-and-insert), hashed_code unique 충돌(IntegrityError)이면 다음 후보
+    - 동시 요청이 같은 제조번호를 먼저 저장한 경우(original_code 충돌) 그 행을 반환
+
     캐시 일관성:
       - 신규 생성 시 HASH_CACHE_KEY 무효화(삭제) → 다음 조회 시 재빌드.
+      - 기존 매핑 조회는 _get_hash_by_code(Django 캐시 read-through)를 거침.
     """
-    try:
-        return ManufacturingHash.objects.get(original_code=code)
-    except ManufacturingHash.DoesNotExist:
-        hashed_code = generate_hash_for_manufacturing_code(code)
-        hash_obj = ManufacturingHash.objects.create(
-            original_code=code,
-            hashed_code=hashed_code
-        )
+    hash_obj = _get_hash_by_code(code)
+    if hash_obj is not None:
+        return hash_obj
+
+    if not code:
+        raise ValueError("제조번호가 비어있습니다.")
+
+    for hashed_code in _iter_hash_candidates(code, MAX_HASH_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                hash_obj = ManufacturingHash.objects.create(original_code=code, hashed_code=hashed_code)
+        except IntegrityError:
+            existing = ManufacturingHash.objects.filter(original_code=code).first()
+            if existing is not None:
+                return existing
+            continue
         cache.delete(HASH_CACHE_KEY)
         return hash_obj
 
+    raise Exception("제조번호 해시 생성 실패: 충돌 한도 초과")
+
+
+# =============================================================================
+# 타입 조회 유틸
+# =============================================================================
+
+@lru_cache(maxsize=32)
+def get_type(name):
+    """
+    Type 이름(재고/출고/검수 등) → Type 객체. (프로세스 단위 캐시)
+
+    Why:
+      - 요청 1건에서 여러 헬퍼가 같은 Type을 반복 조회(SELECT 2~3회).
+      - 행 수가 적고 런타임에 거의 바뀌지 않는 참조 데이터 → 최초 1회만 조회.
+
+    Raises:
+      Type.DoesNotExist: 해당 이름의 타입이 없을 때(예외는 캐시되지 않음)
+    """
+    return Type.objects.get(name=name)
+
+
+@receiver([post_save, post_delete], sender=Type)
+def _invalidate_type_cache(sender, **kwargs):
+    """Type 추가/수정/삭제 시 get_type 캐시 비우기."""
+    get_type.cache_clear()
+
 
 # =============================================================================
 # 날짜/캐시 유틸
 # =============================================================================
 
+def get_or_create_date(company, type_obj, date_value):
+    """
+    (company, type, date) Date 조회, 없으면 생성.
+
+    동시성:
+      - uniq_date_company_type_date 제약 + INSERT ... ON CONFLICT DO NOTHING(ignore_conflicts)
+        → 동시 업로드가 같은 Date를 만들어도 IntegrityError/중복 row 없이 같은 객체로 수렴.
+      - get_or_create와 달리 미스 경로에서 savepoint를 만들지 않음.
+    """
+    lookup = {"company": company, "type": type_obj, "date": date_value}
+    try:
+        return Date.objects.get(**lookup)
+    except Date.DoesNotExist:
+        Date.objects.bulk_create([Date(**lookup)], ignore_conflicts=True)
+        return Date.objects.get(**lookup)
+
+
+def parse_yyyymmdd(value):
+    """
+    'YYYYMMDD' 문자열 → date. 위치가 고정이라 strptime(포맷 해석) 대신 int 슬라이스로 변환.
+    형식/날짜 오류는 strptime과 동일하게 ValueError.
+    """
+    if len(value) != 8 or not (value.isascii() and value.isdigit()):
+        raise ValueError(f"YYYYMMDD 형식이 아닙니다: {value}")
+    return date(int(value[:4]), int(value[4:6]), int(value[6:]))
+
+
 def normalize_date(_date):
     """
     다양한 형태의 입력(문자열/Datetime/Date-like)을 date 객체로 정규화.
 
     지원 포맷(문자열):
-      - YYYYMMDD, YYYY-MM-DD, YYYY/MM/DD
+      - YYYYMMDD(parse_yyyymmdd), YYYY-MM-DD, YYYY/MM/DD (길이/구분자로 분기)
     """
     try:
         if isinstance(_date, str):
-            for fmt in ("%Y%m%d", "%Y-%m-%d", "%Y/%m/%d"):
-                try:
-                    return datetime.strptime(_date, fmt).date()
-                except ValueError:
-                    continue
-            raise DateFormatError(f"지원하지 않는 문자열 날짜 형식: {_date}")
+            if len(_date) == 8 and _date.isdigit():
+                return parse_yyyymmdd(_date)
+            # 구분자로 포맷을 바로 결정(포맷 순차 시도/예외 처리 없음)
+            sep = '-' if '-' in _date else '/' if '/' in _date else None
+            if sep is None:
+                raise DateFormatError(f"지원하지 않는 문자열 날짜 형식: {_date}")
+            if len(_date) == 10 and _date[4] == sep and _date[7] == sep:
+                y, m, d = _date[:4], _date[5:7], _date[8:]
+                if (y + m + d).isascii() and (y + m + d).isdigit():
+                    return date(int(y), int(m), int(d))
+            # 0 패딩 없는 형태(예: 2024-1-5)는 strptime으로
+            return datetime.strptime(_date, f"%Y{sep}%m{sep}%d").date()
         elif isinstance(_date, datetime):
             return _date.date()
         elif hasattr(_date, 'date'):
@@ -606,7 +881,7 @@ def clear_cache():
         logger.info("[Cache] clear 완료")
         return True
     except Exception as e:
-        logger.error(f"[Cache] clear 실패: {e}")
+        logger.error("[Cache] clear 실패: %s", e)
         return False
 
 
@@ -626,7 +901,7 @@ def get_cache_stats():
             "cache_backend": getattr(settings, 'CACHES', {}).get('default', {}).get('BACKEND', 'unknown')
         }
     except Exception as e:
-        logger.error(f"[Cache] 통계 조회 실패: {e}")
+        logger.error("[Cache] 통계 조회 실패: %s", e)
         return {"error": str(e)}
 
 
@@ -641,10 +916,10 @@ def _validate_stock_quantity(quantity, operation_type):
       - 비현실적 대수량 상한
     """
     if quantity < 0:
-        logger.warning(f"[Qty] 음수 감지: {quantity} (type: {operation_type})")
+        logger.warning("[Qty] 음수 감지: %s (type: %s)", quantity, operation_type)
         return False
     if quantity > 999999:
-        logger.warning(f"[Qty] 과도한 수량: {quantity} (type: {operation_type})")
+        logger.warning("[Qty] 과도한 수량: %s (type: %s)", quantity, operation_type)
         return False
     return True
 
@@ -667,25 +942,25 @@ def _handle_duplicate_specification(spec_map, key, instance, operation_type):
 
         if operation_type == "재고":
             existing_spec.stock_quantity += instance.scanned_quantity
-            logger.info(f"[Dup/재고] 누적: {key} → +{instance.scanned_quantity}")
+            logger.info("[Dup/재고] 누적: %s → +%s", key, instance.scanned_quantity)
 
         elif operation_type == "출고":
             new_quantity = existing_spec.stock_quantity - instance.scanned_quantity
             if not _validate_stock_quantity(new_quantity, operation_type):
-                logger.error(f"[Dup/출고] 음수 발생 위험: {existing_spec.stock_quantity} - {instance.scanned_quantity}")
+                logger.error("[Dup/출고] 음수 발생 위험: %s - %s", existing_spec.stock_quantity, instance.scanned_quantity)
                 return None
             existing_spec.stock_quantity = new_quantity
-            logger.info(f"[Dup/출고] 차감: {key} → {new_quantity}")
+            logger.info("[Dup/출고] 차감: %s → %s", key, new_quantity)
 
         elif operation_type == "검수":
             existing_spec.stock_quantity = instance.scanned_quantity
-            logger.info(f"[Dup/검수] 설정: {key} → {instance.scanned_quantity}")
+            logger.info("[Dup/검수] 설정: %s → %s", key, instance.scanned_quantity)
 
         else:
             existing_spec.stock_quantity += instance.scanned_quantity
-            logger.info(f"[Dup] 누적: {key} → {existing_spec.stock_quantity}")
+            logger.info("[Dup] 누적: %s → %s", key, existing_spec.stock_quantity)
 
-        existing_spec.date = instance.date  # 최신 날짜로 동기화
+        existing_spec.date_id = instance.date_id  # 최신 날짜로 동기화
         return (None, existing_spec)
 
     return None
@@ -704,11 +979,11 @@ def _create_new_specification(instance, default, operation_type):
     if operation_type == "출고":
         initial_quantity = -instance.scanned_quantity
         if not _validate_stock_quantity(abs(initial_quantity), operation_type):
-            logger.error(f"[NewSpec/출고] 수량 검증 실패: {instance.scanned_quantity}")
+            logger.error("[NewSpec/출고] 수량 검증 실패: %s", instance.scanned_quantity)
             return None
 
     new_spec = Specification(
-        date=instance.date,
+        date_id=instance.date_id,
         medication_created_by=default.medication_created_by,
         pie_healthcare_num=default.pie_healthcare_num,
         medication_name=default.medication_name,
@@ -719,7 +994,7 @@ def _create_new_specification(instance, default, operation_type):
         stock_quantity=initial_quantity
     )
 
-    logger.info(f"[NewSpec] 생성: pie={default.pie_healthcare_num} qty={initial_quantity}")
+    logger.info("[NewSpec] 생성: pie=%s qty=%s", default.pie_healthcare_num, initial_quantity)
     return new_spec
 
 
@@ -743,32 +1018,48 @@ def carry_over_inventory(previous_date_obj, new_date_obj):
 
     try:
         with transaction.atomic():
-            prev_inventories = Inventory2.objects.filter(date=previous_date_obj)
-            created_count = 0
-            updated_count = 0
+            # 이전/새 날짜 재고를 각각 1회 조회 후 키 단위로 bulk_create/bulk_update (행당 update_or_create 제거)
+            key_fields = ('pie_healthcare_num', 'expiry_date', 'medication_lot_number')
+            prev_inventories = Inventory2.objects.filter(date=previous_date_obj).order_by('id').only(
+                *key_fields, *INVENTORY_SNAPSHOT_FIELDS
+            )
+            existing = {}
+            for inv in Inventory2.objects.filter(date=new_date_obj).order_by('id').only('id', *key_fields):
+                existing.setdefault((inv.pie_healthcare_num, inv.expiry_date, inv.medication_lot_number), inv)
 
+            to_update, to_create = {}, {}
+            row_count = 0
             for inv in prev_inventories:
-                obj, created = Inventory2.objects.update_or_create(
-                    date=new_date_obj,
-                    pie_healthcare_num=inv.pie_healthcare_num,
-                    expiry_date=inv.expiry_date,
-                    medication_lot_number=inv.medication_lot_number,
-                    defaults={
-                        "medication_created_by": inv.medication_created_by,
-                        "medication_name": inv.medication_name,
-                        "medication_size": inv.medication_size,
-                        "stock_location": inv.stock_location,
-                        "stock_quantity": inv.stock_quantity
-                    }
-                )
-                if created:
-                    created_count += 1
+                row_count += 1
+                key = (inv.pie_healthcare_num, inv.expiry_date, inv.medication_lot_number)
+                target = existing.get(key)
+                if target is not None:
+                    to_update[target.pk] = target
                 else:
-                    updated_count += 1
+                    target = to_create.get(key) or Inventory2(
+                        date=new_date_obj,
+                        pie_healthcare_num=inv.pie_healthcare_num,
+                        expiry_date=inv.expiry_date,
+                        medication_lot_number=inv.medication_lot_number,
+                    )
+                    to_create[key] = target
+                for field in INVENTORY_SNAPSHOT_FIELDS:
+                    setattr(target, field, getattr(inv, field))
+
+            if to_update:
+                Inventory2.objects.bulk_update(
+                    to_update.values(), INVENTORY_SNAPSHOT_FIELDS, batch_size=BULK_BATCH_SIZE
+                )
+            if to_create:
+                Inventory2.objects.bulk_create(
+                    to_create.values(), batch_size=BULK_BATCH_SIZE, ignore_conflicts=True
+                )
+            created_count = len(to_create)
+            updated_count = row_count - created_count
 
-            logger.info(f"[CarryOver] {previous_date_obj} → {new_date_obj} | create={created_count}, update={updated_count}")
+            logger.info("[CarryOver] %s → %s | create=%s, update=%s", previous_date_obj, new_date_obj, created_count, updated_count)
             return {"success": True, "created": created_count, "updated": updated_count}
 
     except Exception as e:
-        logger.error(f"[CarryOver] 실패: {e}")
+        logger.error("[CarryOver] 실패: %s", e)
         return {"success": False, "message": str(e)}
\ No newline at end of file